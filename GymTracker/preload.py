@@ -0,0 +1,29 @@
+"""
+Warm up URL resolution and the cached template loader at process start.
+"""
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.template import engines
+from django.urls import get_resolver
+
+
+def _template_names():
+    dirs = [Path(d) for d in settings.TEMPLATES[0]['DIRS']]
+    dirs += [Path(app.path) / 'templates' for app in apps.get_app_configs()]
+    for base in dirs:
+        if base.is_dir():
+            for path in sorted(base.rglob('*.html')):
+                yield path.relative_to(base).as_posix()
+
+
+def warm_up():
+    resolver = get_resolver()
+    resolver.reverse_dict  # populates the resolver's lookup tables
+    engine = engines['django']
+    loaded = 0
+    for name in _template_names():
+        engine.get_template(name)
+        loaded += 1
+    return loaded
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +40,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'workouts',
     'users',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -49,6 +51,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'GymTracker.routers.ReplicaPinMiddleware',
 ]
 
 ROOT_URLCONF = 'GymTracker.urls'
@@ -81,6 +84,53 @@ DATABASES = {
     }
 }
 
+# Optional read replica for analytics/list views (see GymTracker/routers.py).
+# Locally: GYMTRACKER_REPLICA_DB=replica.sqlite3 and `manage.py sync_replica`
+# to copy the primary into it.
+if os.environ.get('GYMTRACKER_REPLICA_DB'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['GYMTRACKER_REPLICA_DB'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['GymTracker.routers.PrimaryReplicaRouter']
+
+# Seconds a user keeps reading from the primary after a write request
+REPLICA_PIN_SECONDS = 10
+
+
+# Cache (login throttling, progress series). LocMemCache is per process, which
+# is fine for runserver; settings_prod switches to a cache shared by all workers.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# 'db' works with any number of workers; 'cached_db' only pays off with a shared
+# cache (settings_prod uses it with Redis) and 'signed_cookies' avoids server-side storage.
+# Run `manage.py clearsessions` periodically (e.g. from cron) for DB-backed engines.
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.environ.get('DJANGO_SESSION_BACKEND', 'db')
+
+
+# Password hashing
+# Explicit PBKDF2 cost instead of the Django default; existing hashes are
+# upgraded/downgraded on the next successful login.
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('DJANGO_PASSWORD_HASH_ITERATIONS', 600_000))
+
+PASSWORD_HASHERS = [
+    'users.hashers.TunedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+]
+
+# Per-IP login/registration attempts allowed per window (seconds)
+AUTH_ATTEMPTS_LIMIT = 10
+AUTH_ATTEMPTS_WINDOW = 300
+# Number of reverse proxies in front of the app that append to X-Forwarded-For;
+# 0 means REMOTE_ADDR is the client (the header is client-controlled then).
+AUTH_TRUSTED_PROXY_COUNT = int(os.environ.get('DJANGO_TRUSTED_PROXY_COUNT', 0))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -119,4 +169,12 @@ USE_TZ = True
 STATIC_URL = 'static/'
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'home'
-LOGOUT_REDIRECT_URL = 'home'
\ No newline at end of file
+LOGOUT_REDIRECT_URL = 'home'
+
+# Columnar per-user set history used by analytics (see workouts/snapshot.py)
+WORKOUTS_SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+# Rebuild snapshots older than this (seconds), whatever writes they may have missed
+WORKOUTS_SNAPSHOT_MAX_AGE = 24 * 60 * 60
+
+# Workouts older than this are moved out of the hot tables by `manage.py archive_workouts`
+WORKOUTS_ARCHIVE_AFTER_DAYS = 365
@@ -0,0 +1,62 @@
+"""
+Lean production settings for GymTracker.
+
+Usage: DJANGO_SETTINGS_MODULE=GymTracker.settings_prod gunicorn GymTracker.wsgi
+"""
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+
+DEBUG = False
+
+# Never fall back to the development key checked into settings.py.
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    raise ImproperlyConfigured('DJANGO_SECRET_KEY must be set for production settings')
+ALLOWED_HOSTS = os.environ.get('DJANGO_ALLOWED_HOSTS', 'localhost,127.0.0.1').split(',')
+
+# Sessions, login throttling and cached progress series must be shared by all
+# gunicorn workers: Redis when DJANGO_REDIS_URL is set, otherwise a database
+# table (create it once with `manage.py createcachetable`).
+if os.environ.get('DJANGO_REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ['DJANGO_REDIS_URL'],
+        }
+    }
+    SESSION_ENGINE = 'django.contrib.sessions.backends.' + os.environ.get('DJANGO_SESSION_BACKEND', 'cached_db')
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'gymtracker_cache',
+        }
+    }
+
+# The admin needs its CSS/JS: `manage.py collectstatic` copies them here and
+# the reverse proxy serves STATIC_ROOT at STATIC_URL (workers don't serve files).
+STATIC_ROOT = os.environ.get('DJANGO_STATIC_ROOT', BASE_DIR / 'staticfiles')
+
+# UI strings are hard-coded, no translation catalogs needed.
+USE_I18N = False
+
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    },
+}]
+
+# Resolve URLs and compile templates once in the gunicorn master (preload_app)
+# so forked workers share them copy-on-write.
+PRELOAD_ON_STARTUP = True
@@ -0,0 +1,93 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from workouts import series
+from workouts.models import Exercise
+
+from .routers import PIN_COOKIE, REPLICA_DB_ALIAS, PrimaryReplicaRouter, use_replica
+
+
+class ReplicaTestCase(TransactionTestCase):
+    """
+    Adds a ``replica`` alias mirroring the test database, the way
+    ``TEST: {"MIRROR": "default"}`` does when GYMTRACKER_REPLICA_DB is set.
+    A TransactionTestCase, so rows are committed and visible through both
+    connections.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        connections.databases[REPLICA_DB_ALIAS] = {
+            **connections.databases[DEFAULT_DB_ALIAS],
+            "TEST": {**connections.databases[DEFAULT_DB_ALIAS]["TEST"], "MIRROR": DEFAULT_DB_ALIAS},
+        }
+        # Declared only now: the runner has nothing to create for a mirror.
+        cls.databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[REPLICA_DB_ALIAS].close()
+        del connections[REPLICA_DB_ALIAS]
+        del connections.databases[REPLICA_DB_ALIAS]
+        del cls.databases
+        super().tearDownClass()
+
+
+class PrimaryReplicaRouterTests(ReplicaTestCase):
+    def test_reads_use_replica_only_inside_use_replica(self):
+        router = PrimaryReplicaRouter()
+        self.assertEqual(router.db_for_read(Exercise), DEFAULT_DB_ALIAS)
+        with use_replica():
+            self.assertEqual(router.db_for_read(Exercise), REPLICA_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Exercise), DEFAULT_DB_ALIAS)
+
+    def test_writes_and_migrations_use_primary(self):
+        router = PrimaryReplicaRouter()
+        with use_replica():
+            self.assertEqual(router.db_for_write(Exercise), DEFAULT_DB_ALIAS)
+        self.assertTrue(router.allow_migrate(DEFAULT_DB_ALIAS, "workouts"))
+        self.assertFalse(router.allow_migrate(REPLICA_DB_ALIAS, "workouts"))
+
+
+class ReplicaViewTests(ReplicaTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("lifter", password="pw")
+        self.exercise = Exercise.objects.create(user=self.user, name="Squat", muscle_group="Legs")
+        self.client.force_login(self.user)
+
+    def get_exercise_list(self):
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica_queries:
+            response = self.client.get(reverse("exercise_list"))
+        self.assertContains(response, "Squat")
+        return [query["sql"] for query in replica_queries]
+
+    def test_list_view_reads_from_replica(self):
+        replica_queries = self.get_exercise_list()
+        self.assertTrue(any("workouts_exercise" in sql for sql in replica_queries), replica_queries)
+
+    def test_post_pins_primary(self):
+        response = self.client.post(reverse("exercise_add"), {"name": "Bench", "muscle_group": "Chest"})
+        self.assertEqual(response.status_code, 302)
+        cookie = response.cookies[PIN_COOKIE]
+        self.assertGreater(float(cookie.value), time.time())
+        self.assertTrue(Exercise.objects.filter(name="Bench").exists())
+
+        self.assertEqual(self.get_exercise_list(), [])
+
+    def test_expired_pin_reads_from_replica_again(self):
+        self.client.cookies[PIN_COOKIE] = str(time.time() - 1)
+        self.assertNotEqual(self.get_exercise_list(), [])
+
+    def test_cached_series_read_from_primary(self):
+        # Cached under the primary's history version, so never built from replica rows.
+        cache.clear()
+        with use_replica(), CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica_queries:
+            series.exercise_series(self.user.id, [self.exercise.id])
+        self.assertEqual([query["sql"] for query in replica_queries], [])
@@ -21,4 +21,5 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('workouts.urls')),
     path('', include('users.urls')),
+    path('jobs/', include('jobs.urls')),
 ]
@@ -0,0 +1,8 @@
+# DJANGO_SETTINGS_MODULE=GymTracker.settings_prod gunicorn GymTracker.wsgi
+bind = "0.0.0.0:8000"
+workers = 3
+# Import the app, resolve URLs and compile templates once in the master;
+# workers are forked afterwards and share that memory copy-on-write.
+preload_app = True
+max_requests = 2000
+max_requests_jitter = 200
@@ -0,0 +1,70 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs import worker
+
+
+def _init_process(settings_module):
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", settings_module)
+    django.setup()
+
+
+def _work(poll_interval, burst):
+    try:
+        return worker.work(poll_interval=poll_interval, burst=burst)
+    except KeyboardInterrupt:
+        return 0
+
+
+class Command(BaseCommand):
+    help = "Run background job workers in a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=2)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument("--burst", action="store_true", help="Exit once the queue is empty")
+
+    def handle(self, *args, **opts):
+        # Forked workers must not share the parent's database connection.
+        connections.close_all()
+
+        processes = opts["processes"]
+        processed = 0
+        while True:
+            self.stdout.write(f"Starting {processes} worker(s)")
+            try:
+                processed += self._run_pool(opts)
+            except BrokenProcessPool:
+                # A child was killed (OOM, signal); its job is requeued once stale.
+                self.stdout.write(self.style.ERROR("A worker process died, restarting the pool"))
+                time.sleep(opts["poll_interval"])
+                continue
+            except KeyboardInterrupt:
+                self.stdout.write(self.style.WARNING("Stopping workers"))
+                return
+            break
+
+        self.stdout.write(self.style.SUCCESS(f"Processed jobs: {processed}"))
+
+    def _run_pool(self, opts):
+        processes = opts["processes"]
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_process,
+            initargs=(os.environ["DJANGO_SETTINGS_MODULE"],),
+        ) as pool:
+            futures = [
+                pool.submit(_work, opts["poll_interval"], opts["burst"])
+                for _ in range(processes)
+            ]
+            try:
+                return sum(f.result() for f in futures)
+            except KeyboardInterrupt:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
@@ -0,0 +1,48 @@
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+
+
+_handlers = {}
+
+
+def job(name, max_attempts=3):
+    """
+    Register ``func(job, **args)`` as the handler for jobs of kind ``name``.
+
+    Handlers live in ``<app>/jobs.py`` modules, which are imported on startup.
+    """
+    def decorator(func):
+        _handlers[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def get_handler(name):
+    return _handlers[name][0]
+
+
+def enqueue(name, user=None, **args):
+    """
+    Queue a job, or return the already queued/running one of the same kind
+    for this user.
+    """
+    if name not in _handlers:
+        raise KeyError(f"Unknown job: {name}")
+
+    active = Job.objects.filter(kind=name, user=user, status__in=Job.ACTIVE_STATUSES)
+    existing = active.first()
+    if existing is not None:
+        return existing
+    try:
+        with transaction.atomic():
+            return Job.objects.create(
+                kind=name,
+                user=user,
+                args=args,
+                max_attempts=_handlers[name][1],
+                run_after=timezone.now(),
+            )
+    except IntegrityError:
+        return active.get()
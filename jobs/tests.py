@@ -0,0 +1,121 @@
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .registry import enqueue, job
+from . import worker
+from .management.commands import run_workers
+
+
+calls = []
+
+
+@job("test_ok")
+def ok_job(job, value=None):
+    calls.append(value)
+    job.set_progress(done=1, total=1)
+    return {"value": value}
+
+
+@job("test_failing", max_attempts=2)
+def failing_job(job, **args):
+    raise RuntimeError("boom")
+
+
+class EnqueueTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("lifter", password="pw")
+
+    def test_active_job_is_reused(self):
+        first = enqueue("test_ok", user=self.user, value=1)
+        second = enqueue("test_ok", user=self.user, value=2)
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_new_job_after_previous_finished(self):
+        first = enqueue("test_ok", user=self.user)
+        Job.objects.filter(pk=first.pk).update(status=Job.DONE)
+        second = enqueue("test_ok", user=self.user)
+        self.assertNotEqual(first.pk, second.pk)
+
+    def test_unknown_job(self):
+        with self.assertRaises(KeyError):
+            enqueue("missing")
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_job(self):
+        queued = enqueue("test_ok", value=5)
+        self.assertEqual(worker.work(burst=True), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.DONE)
+        self.assertEqual(queued.result, {"value": 5})
+        self.assertEqual(queued.progress, {"done": 1, "total": 1})
+        self.assertEqual(calls, [5])
+
+    def test_claim_skips_future_and_claimed_jobs(self):
+        later = enqueue("test_ok")
+        Job.objects.filter(pk=later.pk).update(run_after=timezone.now() + timedelta(minutes=5))
+        self.assertIsNone(worker.claim_next())
+
+        Job.objects.filter(pk=later.pk).update(run_after=timezone.now())
+        claimed = worker.claim_next()
+        self.assertEqual(claimed.pk, later.pk)
+        self.assertEqual(claimed.status, Job.RUNNING)
+        self.assertIsNone(worker.claim_next())
+
+    def test_failure_is_retried_with_backoff_then_failed(self):
+        queued = enqueue("test_failing")
+        before = timezone.now()
+        worker.run(worker.claim_next())
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.QUEUED)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn("boom", queued.error)
+        self.assertGreaterEqual(queued.run_after, before + timedelta(seconds=worker.RETRY_DELAY_SECONDS))
+
+        Job.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        worker.run(worker.claim_next())
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.FAILED)
+        self.assertEqual(queued.attempts, 2)
+
+    def test_progress_keeps_job_from_looking_stale(self):
+        queued = enqueue("test_ok")
+        old = timezone.now() - worker.STALE_AFTER - timedelta(minutes=1)
+        Job.objects.filter(pk=queued.pk).update(status=Job.RUNNING, updated_at=old)
+        queued.set_progress(done=1)
+        self.assertEqual(worker.requeue_stale(), 0)
+
+        Job.objects.filter(pk=queued.pk).update(updated_at=old)
+        self.assertEqual(worker.requeue_stale(), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.QUEUED)
+
+    def test_work_requeues_jobs_of_dead_workers(self):
+        queued = enqueue("test_ok", value=7)
+        old = timezone.now() - worker.STALE_AFTER - timedelta(minutes=1)
+        Job.objects.filter(pk=queued.pk).update(status=Job.RUNNING, updated_at=old)
+        self.assertEqual(worker.work(burst=True), 1)
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, Job.DONE)
+
+
+class RunWorkersTests(TestCase):
+    def test_pool_is_restarted_when_a_worker_dies(self):
+        out = StringIO()
+        with mock.patch.object(run_workers.Command, "_run_pool", side_effect=[BrokenProcessPool(), 3]) as run_pool:
+            call_command("run_workers", burst=True, poll_interval=0, stdout=out)
+        self.assertEqual(run_pool.call_count, 2)
+        self.assertIn("restarting the pool", out.getvalue())
+        self.assertIn("Processed jobs: 3", out.getvalue())
@@ -0,0 +1,28 @@
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .models import Job
+
+
+@login_required
+def job_status(request, pk):
+    job = get_object_or_404(Job, pk=pk, user=request.user)
+    return JsonResponse({
+        "id": job.pk,
+        "kind": job.kind,
+        "status": job.status,
+        "attempts": job.attempts,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error.strip().splitlines()[-1] if job.error else "",
+        "updated_at": job.updated_at.isoformat(),
+    })
+
+
+@login_required
+def job_list(request):
+    jobs = Job.objects.filter(user=request.user).values(
+        "id", "kind", "status", "attempts", "updated_at"
+    )[:50]
+    return JsonResponse({"jobs": list(jobs)})
@@ -0,0 +1,85 @@
+import time
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+
+RETRY_DELAY_SECONDS = 30
+STALE_AFTER = timedelta(minutes=30)
+STALE_CHECK_INTERVAL = 60
+
+
+def requeue_stale():
+    """Put back jobs left in ``running`` by a worker that died."""
+    return Job.objects.filter(
+        status=Job.RUNNING, updated_at__lt=timezone.now() - STALE_AFTER
+    ).update(status=Job.QUEUED, updated_at=timezone.now())
+
+
+def claim_next():
+    candidates = (
+        Job.objects
+        .filter(status=Job.QUEUED, run_after__lte=timezone.now())
+        .order_by("run_after", "id")
+        .values_list("id", flat=True)[:10]
+    )
+    for job_id in candidates:
+        claimed = Job.objects.filter(pk=job_id, status=Job.QUEUED).update(
+            status=Job.RUNNING, updated_at=timezone.now()
+        )
+        if claimed:
+            return Job.objects.get(pk=job_id)
+    return None
+
+
+def run(job):
+    job.attempts += 1
+    try:
+        result = get_handler(job.kind)(job, **job.args)
+    except Exception:
+        job.error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.QUEUED
+            delay = RETRY_DELAY_SECONDS * 2 ** (job.attempts - 1)
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+        else:
+            job.status = Job.FAILED
+    else:
+        job.status = Job.DONE
+        job.result = result
+        job.error = ""
+    Job.objects.filter(pk=job.pk).update(
+        status=job.status,
+        attempts=job.attempts,
+        run_after=job.run_after,
+        result=job.result,
+        error=job.error,
+        updated_at=timezone.now(),
+    )
+    return job
+
+
+def work(poll_interval=1.0, burst=False):
+    """Process jobs until interrupted; with ``burst`` stop once the queue is empty."""
+    processed = 0
+    next_stale_check = 0
+    while True:
+        close_old_connections()
+        if time.monotonic() >= next_stale_check:
+            # A job whose worker died would otherwise block its kind for that
+            # user (uniq_active_job_per_user) until a restart.
+            requeue_stale()
+            next_stale_check = time.monotonic() + STALE_CHECK_INTERVAL
+        job = claim_next()
+        if job is None:
+            if burst:
+                return processed
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        processed += 1
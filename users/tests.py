@@ -1,3 +1,81 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from .throttle import client_ip
+
+
+@override_settings(AUTH_ATTEMPTS_LIMIT=3)
+class LoginThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("lifter", password="correct-horse")
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, password, username="lifter"):
+        return self.client.post(reverse("login"), {"username": username, "password": password})
+
+    def test_limit_returns_429(self):
+        for _ in range(3):
+            self.assertEqual(self.login("wrong").status_code, 200)
+        response = self.login("correct-horse")
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.context["throttled"])
+        self.assertNotIn("_auth_user_id", self.client.session)
+
+    def test_throttled_request_skips_password_check(self):
+        for _ in range(3):
+            self.login("wrong")
+        with mock.patch("django.contrib.auth.forms.authenticate") as authenticate:
+            self.assertEqual(self.login("wrong").status_code, 429)
+        authenticate.assert_not_called()
+
+    def test_successful_login_keeps_counter(self):
+        User.objects.create_user("victim", password="secret-pw")
+        for _ in range(2):
+            self.login("guess", username="victim")
+        self.assertEqual(self.login("correct-horse").status_code, 302)
+        self.client.logout()
+        self.login("guess", username="victim")
+        self.assertEqual(self.login("secret-pw", username="victim").status_code, 429)
+
+
+class ClientIpTests(TestCase):
+    def request(self, forwarded=None):
+        headers = {"HTTP_X_FORWARDED_FOR": forwarded} if forwarded else {}
+        return RequestFactory().get("/", REMOTE_ADDR="10.0.0.1", **headers)
+
+    @override_settings(AUTH_TRUSTED_PROXY_COUNT=0)
+    def test_header_ignored_without_trusted_proxies(self):
+        self.assertEqual(client_ip(self.request("1.2.3.4")), "10.0.0.1")
+
+    @override_settings(AUTH_TRUSTED_PROXY_COUNT=1)
+    def test_address_seen_by_trusted_proxy(self):
+        self.assertEqual(client_ip(self.request("6.6.6.6, 1.2.3.4")), "1.2.3.4")
+        self.assertEqual(client_ip(self.request()), "10.0.0.1")
+
+    @override_settings(AUTH_TRUSTED_PROXY_COUNT=2)
+    def test_spoofed_entries_left_of_proxies_ignored(self):
+        self.assertEqual(client_ip(self.request("6.6.6.6, 1.2.3.4, 172.16.0.2")), "1.2.3.4")
+        self.assertEqual(client_ip(self.request("1.2.3.4")), "1.2.3.4")
+
+
+class TunedHasherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_login_rehashes_with_configured_iterations(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            user = User.objects.create_user("lifter", password="correct-horse")
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$1000$"))
+
+        with override_settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = self.client.post(reverse("login"), {"username": "lifter", "password": "correct-horse"})
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith("pbkdf2_sha256$2000$"))
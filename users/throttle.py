@@ -0,0 +1,35 @@
+"""
+Per-IP attempt counters kept in the cache, checked before any password
+hashing happens.
+"""
+from django.conf import settings
+from django.core.cache import cache
+
+
+def client_ip(request):
+    proxies = settings.AUTH_TRUSTED_PROXY_COUNT
+    forwarded = request.META.get("HTTP_X_FORWARDED_FOR")
+    if proxies and forwarded:
+        # Each trusted proxy appends the address it saw; anything further left
+        # is whatever the client sent.
+        addresses = [address.strip() for address in forwarded.split(",")]
+        return addresses[max(len(addresses) - proxies, 0)]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def _key(scope, request):
+    return f"throttle:{scope}:{client_ip(request)}"
+
+
+def is_throttled(scope, request):
+    return cache.get(_key(scope, request), 0) >= settings.AUTH_ATTEMPTS_LIMIT
+
+
+def register_attempt(scope, request):
+    key = _key(scope, request)
+    cache.add(key, 0, timeout=settings.AUTH_ATTEMPTS_WINDOW)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr().
+        cache.set(key, 1, timeout=settings.AUTH_ATTEMPTS_WINDOW)
@@ -2,9 +2,14 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login
 from django.contrib.auth.forms import AuthenticationForm
 from .forms import CustomUserCreationForm
+from . import throttle
 
 def register_view(request):
     if request.method == 'POST':
+        if throttle.is_throttled('register', request):
+            form = CustomUserCreationForm()
+            return render(request, 'users/register.html', {'form': form, 'throttled': True}, status=429)
+        throttle.register_attempt('register', request)
         form = CustomUserCreationForm(request.POST)
         if form.is_valid():
             user = form.save()
@@ -16,11 +21,17 @@ def register_view(request):
 
 def login_view(request):
     if request.method == 'POST':
+        if throttle.is_throttled('login', request):
+            form = AuthenticationForm(request)
+            return render(request, 'users/login.html', {'form': form, 'throttled': True}, status=429)
         form = AuthenticationForm(request, data=request.POST)
         if form.is_valid():
+            # The counter is kept: one valid account must not buy unlimited
+            # guesses against others from the same IP.
             user = form.get_user()
             login(request, user)
             return redirect('workout_list')
+        throttle.register_attempt('login', request)
     else:
         form = AuthenticationForm()
-    return render(request, 'users/login.html', {'form': form})
\ No newline at end of file
+    return render(request, 'users/login.html', {'form': form})
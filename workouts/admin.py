@@ -1,26 +1,94 @@
 from django.contrib import admin
-from .models import Exercise, Workout, SetEntry
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from .models import Exercise, Workout, SetEntry, ArchivedWorkout
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the planner's row estimate instead of running
+    COUNT(*) over an unfiltered table. Filtered querysets are counted exactly.
+    """
+
+    @cached_property
+    def count(self):
+        query = self.object_list.query
+        if not query.where:
+            estimate = self._estimate(self.object_list.db, self.object_list.model._meta.db_table)
+            if estimate is not None and estimate > 10000:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def _estimate(using, table):
+        connection = connections[using]
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+                row = cursor.fetchone()
+                return row[0] if row and row[0] > 0 else None
+            if connection.vendor == "sqlite":
+                # Filled in by ANALYZE (see workouts/archive.py compact()).
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")
+                if cursor.fetchone() is None:
+                    return None
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+                row = cursor.fetchone()
+                return int(row[0].split()[0]) if row else None
+        return None
 
 
 class SetEntryInline(admin.TabularInline):
     model = SetEntry
-    extra = 1
+    extra = 0
+    autocomplete_fields = ("exercise",)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related("exercise")
 
 
 @admin.register(Workout)
 class WorkoutAdmin(admin.ModelAdmin):
     list_display = ("user", "date", "day_type")
-    list_filter = ("user", "day_type", "date")
+    list_filter = ("day_type",)
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+    autocomplete_fields = ("user",)
+    date_hierarchy = "date"
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     inlines = [SetEntryInline]
 
+    def get_queryset(self, request):
+        # Workout.__str__ uses user.username (autocomplete results, inline headers).
+        return super().get_queryset(request).select_related("user")
+
 
 @admin.register(Exercise)
 class ExerciseAdmin(admin.ModelAdmin):
-    list_display = ("name", "muscle_group")
+    list_display = ("name", "muscle_group", "user")
     list_filter = ("muscle_group",)
+    list_select_related = ("user",)
+    search_fields = ("name", "user__username")
+    autocomplete_fields = ("user",)
 
 
 @admin.register(SetEntry)
 class SetEntryAdmin(admin.ModelAdmin):
     list_display = ("workout", "exercise", "weight", "reps")
-    list_filter = ("exercise",)
+    list_select_related = ("workout__user", "exercise")
+    search_fields = ("exercise__name", "workout__user__username")
+    autocomplete_fields = ("workout", "exercise")
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(ArchivedWorkout)
+class ArchivedWorkoutAdmin(admin.ModelAdmin):
+    list_display = ("user", "date", "day_type", "total_sets", "archived_at")
+    list_select_related = ("user",)
+    search_fields = ("user__username",)
+    date_hierarchy = "date"
+    exclude = ("payload",)
+    readonly_fields = ("user",)
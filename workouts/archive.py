@@ -0,0 +1,170 @@
+"""
+Archival of old workouts out of the hot Workout/SetEntry tables.
+
+An archived workout keeps its per-day rollups (set count and volume) in
+plain columns and per-exercise rollups in a small JSON list so analytics
+still see it, while the full workout and its sets are stored as a
+zlib-compressed JSON payload until restored.
+"""
+import json
+import zlib
+
+from django.db import connection, transaction
+
+from .models import ArchivedWorkout, Exercise, SetEntry, Workout
+from .deletion import raw_delete
+from . import snapshot
+
+
+def _set_items(sets):
+    return [
+        {
+            "id": s.id,
+            "exercise_id": s.exercise_id,
+            "exercise_name": s.exercise.name,
+            "muscle_group": s.exercise.muscle_group,
+            "weight": s.weight,
+            "reps": s.reps,
+            "notes": s.notes,
+            "client_key": str(s.client_key) if s.client_key else None,
+        }
+        for s in sets
+    ]
+
+
+def _pack(workout, items):
+    data = {
+        "notes": workout.notes,
+        "created_at": workout.created_at.isoformat(),
+        "duration_min": workout.duration_min,
+        "bodyweight": workout.bodyweight,
+        "energy": workout.energy,
+        "client_key": str(workout.client_key) if workout.client_key else None,
+        "sets": items,
+    }
+    return zlib.compress(json.dumps(data).encode("utf-8"), 9)
+
+
+def exercise_rollups(items):
+    """Per-exercise set count, max weight, Epley e1RM and volume of packed sets."""
+    rollups = {}
+    for item in items:
+        weight, reps = float(item["weight"]), int(item["reps"])
+        rollup = rollups.get(item["exercise_id"])
+        if rollup is None:
+            rollup = rollups[item["exercise_id"]] = {
+                "exercise_id": item["exercise_id"],
+                "name": item["exercise_name"],
+                "muscle_group": item["muscle_group"],
+                "sets": 0,
+                "max_weight": weight,
+                "e1rm": 0.0,
+                "volume": 0.0,
+            }
+        rollup["sets"] += 1
+        rollup["max_weight"] = max(rollup["max_weight"], weight)
+        rollup["e1rm"] = max(rollup["e1rm"], weight * (1 + reps / 30))
+        rollup["volume"] += weight * reps
+    return list(rollups.values())
+
+
+def _unpack(payload):
+    return json.loads(zlib.decompress(bytes(payload)).decode("utf-8"))
+
+
+@transaction.atomic
+def archive_workout(workout):
+    items = _set_items(workout.sets.select_related("exercise").order_by("id"))
+    archived = ArchivedWorkout.objects.create(
+        user_id=workout.user_id,
+        workout_id=workout.id,
+        date=workout.date,
+        day_type=workout.day_type,
+        total_sets=len(items),
+        total_volume=sum(item["weight"] * item["reps"] for item in items),
+        exercise_rollups=exercise_rollups(items),
+        client_key=workout.client_key,
+        payload=_pack(workout, items),
+    )
+    raw_delete(SetEntry.objects.filter(workout_id=workout.pk))
+    raw_delete(Workout.objects.filter(pk=workout.pk))
+    # With the commit: the snapshot still holds these sets, and analytics
+    # already count them again from the archived rollups.
+    snapshot.invalidate_on_commit(workout.user_id)
+    return archived
+
+
+def archive_older_than(cutoff, users=None):
+    workouts = Workout.objects.filter(date__lt=cutoff).order_by("user_id", "date")
+    if users is not None:
+        workouts = workouts.filter(user__in=users)
+
+    count = 0
+    for workout in workouts.iterator(chunk_size=500):
+        archive_workout(workout)
+        count += 1
+    return count
+
+
+def _exercise_for(user_id, item):
+    exercise = Exercise.objects.filter(user_id=user_id, pk=item["exercise_id"]).first()
+    if exercise is None:
+        exercise, _ = Exercise.objects.get_or_create(
+            user_id=user_id,
+            name=item["exercise_name"],
+            defaults={"muscle_group": item["muscle_group"], "is_active": False},
+        )
+    return exercise
+
+
+@transaction.atomic
+def restore(archived):
+    data = _unpack(archived.payload)
+    workout = Workout.objects.create(
+        id=archived.workout_id,
+        user_id=archived.user_id,
+        date=archived.date,
+        day_type=archived.day_type,
+        notes=data["notes"],
+        duration_min=data["duration_min"],
+        bodyweight=data["bodyweight"],
+        energy=data["energy"],
+        client_key=data.get("client_key"),
+    )
+    Workout.objects.filter(pk=workout.pk).update(created_at=data["created_at"])
+
+    exercises = {}
+    sets = []
+    for item in data["sets"]:
+        if item["exercise_id"] not in exercises:
+            exercises[item["exercise_id"]] = _exercise_for(archived.user_id, item)
+        # Same ids and client keys as before archiving, so synced clients still match them.
+        sets.append(SetEntry(
+            id=item["id"],
+            workout=workout,
+            exercise=exercises[item["exercise_id"]],
+            weight=item["weight"],
+            reps=item["reps"],
+            notes=item["notes"],
+            client_key=item.get("client_key"),
+        ))
+    SetEntry.objects.bulk_create(sets)
+
+    archived.delete()
+    snapshot.invalidate_on_commit(archived.user_id)
+    return workout
+
+
+def compact():
+    """Reclaim space and refresh planner statistics after archiving."""
+    tables = [Workout._meta.db_table, SetEntry._meta.db_table, ArchivedWorkout._meta.db_table]
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("ANALYZE")
+            cursor.execute("VACUUM")
+        elif connection.vendor == "postgresql":
+            for table in tables:
+                cursor.execute(f"VACUUM ANALYZE {connection.ops.quote_name(table)}")
+        else:
+            for table in tables:
+                cursor.execute(f"ANALYZE TABLE {connection.ops.quote_name(table)}")
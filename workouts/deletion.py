@@ -0,0 +1,80 @@
+"""
+Chunked, set-based deletion of workouts and whole accounts.
+
+Django's delete collector loads every cascaded and PROTECT-referenced row
+into memory before deleting, and per row whenever signal receivers are
+connected (workouts/signals.py keeps the history snapshot in sync). Here
+SetEntry and Workout rows are removed with plain DELETE ... WHERE ... IN
+(...) statements, so by the time exercises and the user are deleted nothing
+is left to collect; the snapshot is invalidated once at the end.
+"""
+from django.db import transaction
+
+from .models import ArchivedWorkout, Exercise, HistoryVersion, SetEntry, Workout
+from . import snapshot
+
+
+DELETE_CHUNK_SIZE = 500
+
+
+def _chunks(queryset, chunk_size):
+    last_pk = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
+
+
+def raw_delete(queryset):
+    """DELETE matching rows without collecting them or sending signals."""
+    return queryset._raw_delete(queryset.db)
+
+
+def delete_workout(workout):
+    with transaction.atomic():
+        raw_delete(SetEntry.objects.filter(workout_id=workout.pk))
+        workout.delete()
+
+
+def delete_user(user, chunk_size=DELETE_CHUNK_SIZE, progress=None):
+    """
+    Delete a user and all their data in chunks of ``chunk_size`` workouts.
+
+    ``progress`` is called as ``progress(stage, done, total)`` after each chunk.
+    """
+    def report(stage, done, total):
+        if progress is not None:
+            progress(stage, done, total)
+
+    workouts = Workout.objects.filter(user=user)
+    total = workouts.count()
+    done = 0
+    for ids in _chunks(workouts, chunk_size):
+        with transaction.atomic():
+            raw_delete(SetEntry.objects.filter(workout_id__in=ids))
+            raw_delete(Workout.objects.filter(pk__in=ids))
+        done += len(ids)
+        report("workouts", done, total)
+
+    for stage, queryset in (
+        ("archived", ArchivedWorkout.objects.filter(user=user)),
+        ("exercises", Exercise.objects.filter(user=user)),
+    ):
+        total = queryset.count()
+        done = 0
+        for ids in _chunks(queryset, chunk_size):
+            queryset.model.objects.filter(pk__in=ids).delete()
+            done += len(ids)
+            report(stage, done, total)
+
+    user_id = user.pk
+    user.delete()
+    snapshot.invalidate(user_id)
+    HistoryVersion.objects.filter(user_id=user_id).delete()
+    report("user", 1, 1)
@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from jobs.registry import job
+from . import archive, deletion, snapshot
+
+
+@job("rebuild_snapshot")
+def rebuild_snapshot(job, user_id):
+    snapshot.rebuild(user_id)
+
+
+@job("archive_workouts", max_attempts=1)
+def archive_workouts(job, days):
+    cutoff = timezone.now().date() - timedelta(days=days)
+    users = None
+    if job.user_id:
+        users = get_user_model().objects.filter(pk=job.user_id)
+    count = archive.archive_older_than(cutoff, users=users)
+    if count:
+        archive.compact()
+    return {"archived": count}
+
+
+@job("delete_account")
+def delete_account(job, user_id, chunk_size=deletion.DELETE_CHUNK_SIZE):
+    user = get_user_model().objects.filter(pk=user_id).first()
+    if user is None:
+        return {"deleted": False}
+
+    def progress(stage, done, total):
+        job.set_progress(stage=stage, done=done, total=total)
+
+    deletion.delete_user(user, chunk_size=chunk_size, progress=progress)
+    return {"deleted": True}
@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from workouts import archive
+
+
+class Command(BaseCommand):
+    help = "Move workouts older than the retention horizon into the compressed archive"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=settings.WORKOUTS_ARCHIVE_AFTER_DAYS)
+        parser.add_argument("--username", help="Archive only this user's workouts")
+        parser.add_argument("--no-compact", action="store_true", help="Skip VACUUM/ANALYZE afterwards")
+
+    def handle(self, *args, **opts):
+        if opts["days"] < 1:
+            raise CommandError("--days must be positive")
+
+        users = None
+        if opts["username"]:
+            users = get_user_model().objects.filter(username=opts["username"])
+            if not users.exists():
+                raise CommandError(f"User not found: {opts['username']}")
+
+        cutoff = timezone.now().date() - timedelta(days=opts["days"])
+        count = archive.archive_older_than(cutoff, users=users)
+        self.stdout.write(self.style.SUCCESS(f"Archived workouts older than {cutoff}: {count}"))
+
+        if count and not opts["no_compact"]:
+            archive.compact()
+            self.stdout.write(self.style.SUCCESS("VACUUM/ANALYZE done"))
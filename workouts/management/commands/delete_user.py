@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.registry import enqueue
+from workouts import deletion
+
+
+class Command(BaseCommand):
+    help = "Delete a user with all workouts, sets and exercises in chunks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("username")
+        parser.add_argument("--chunk-size", type=int, default=deletion.DELETE_CHUNK_SIZE)
+        parser.add_argument("--background", action="store_true", help="Queue the deletion for run_workers")
+
+    def handle(self, *args, **opts):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=opts["username"])
+        except User.DoesNotExist:
+            raise CommandError(f"User not found: {opts['username']}")
+
+        if opts["background"]:
+            job = enqueue("delete_account", user=user, user_id=user.pk, chunk_size=opts["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(f"Queued job #{job.pk} ({job.status})"))
+            return
+
+        def progress(stage, done, total):
+            self.stdout.write(f"{stage}: {done}/{total}")
+
+        deletion.delete_user(user, chunk_size=opts["chunk_size"], progress=progress)
+        self.stdout.write(self.style.SUCCESS(f"Deleted user: {opts['username']}"))
@@ -0,0 +1,235 @@
+import asyncio
+import random
+import re
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from http.cookiejar import CookieJar
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+
+WORKOUT_LINK_RE = re.compile(r'href="/workout/(\d+)/"')
+OPTION_RE = re.compile(r'<option value="(\d+)"')
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, name, seconds, ok):
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+
+class VirtualUser:
+    """One gym-goer: logs in, then repeats workout sessions until the deadline."""
+
+    def __init__(self, base_url, username, password, stats, executor, think_time):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.password = password
+        self.stats = stats
+        self.executor = executor
+        self.think_time = think_time
+        self.cookies = CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect()
+        )
+
+    def _csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def _fetch(self, method, path, data):
+        body = None
+        headers = {}
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self._csrf_token())
+            body = urllib.parse.urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        request = urllib.request.Request(self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                return response.status, response.read().decode("utf-8", "replace")
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read().decode("utf-8", "replace")
+        except (urllib.error.URLError, OSError):
+            return 0, ""
+
+    async def request(self, name, path, data=None, expect=(200,)):
+        method = "POST" if data is not None else "GET"
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        status, text = await loop.run_in_executor(self.executor, self._fetch, method, path, data)
+        self.stats.record(name, time.perf_counter() - started, status in expect)
+        return status, text
+
+    async def think(self):
+        if self.think_time:
+            await asyncio.sleep(random.uniform(0.5, 1.5) * self.think_time)
+
+    async def login(self):
+        await self.request("login_page", "/login/")
+        status, _ = await self.request(
+            "login", "/login/", {"username": self.username, "password": self.password}, expect=(302,)
+        )
+        return status == 302
+
+    async def gym_session(self):
+        await self.request(
+            "workout_add", "/workout/add/",
+            {"date": date.today().isoformat(), "day_type": "FullBody", "notes": "load test"},
+            expect=(302,),
+        )
+        _, text = await self.request("workout_list", "/workouts/")
+        match = WORKOUT_LINK_RE.search(text)
+        if match is None:
+            return
+        workout_id = match.group(1)
+        await self.think()
+
+        _, form = await self.request("set_form", f"/workout/{workout_id}/set/add/")
+        exercise_ids = OPTION_RE.findall(form)
+        if not exercise_ids:
+            return
+        for exercise_id in random.sample(exercise_ids, min(len(exercise_ids), random.randint(3, 5))):
+            weight = random.choice([20, 40, 60, 80, 100])
+            for _ in range(3):
+                await self.request(
+                    "set_add", f"/workout/{workout_id}/set/add/",
+                    {"exercise": exercise_id, "weight": weight, "reps": random.randint(5, 12), "notes": ""},
+                    expect=(302,),
+                )
+                await self.request("workout_detail", f"/workout/{workout_id}/")
+                await self.think()
+
+        if random.random() < 0.5:
+            await self.request("progress", "/progress/")
+        if random.random() < 0.3:
+            await self.request("workout_list", "/workouts/")
+
+    async def run(self, deadline):
+        if not await self.login():
+            return
+        while time.monotonic() < deadline:
+            await self.gym_session()
+
+
+def _percentile(values, pct):
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+class Command(BaseCommand):
+    help = "Replay a gym-session traffic mix against a running server and report latency percentiles"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+        parser.add_argument("--duration", type=float, default=60, help="Seconds to run")
+        parser.add_argument("--think-time", type=float, default=1.0, help="Average pause between actions")
+        parser.add_argument("--prefix", default="load", help="Usernames are <prefix>1..<prefix>N")
+        parser.add_argument("--password", default="demo12345")
+        parser.add_argument("--seed", action="store_true", help="Create the users with `seed` first")
+        parser.add_argument(
+            "--server", choices=["gunicorn", "uvicorn", "runserver"],
+            help="Start a local server on --base-url's port for the run",
+        )
+        parser.add_argument("--workers", type=int, default=3, help="Worker processes for --server")
+
+    def handle(self, *args, **opts):
+        usernames = [f"{opts['prefix']}{i}" for i in range(1, opts["users"] + 1)]
+        if opts["seed"]:
+            for username in usernames:
+                call_command(
+                    "seed", username=username, email=f"{username}@example.com",
+                    password=opts["password"], verbosity=0,
+                )
+            self.stdout.write(f"Seeded users: {len(usernames)}")
+
+        server = self._start_server(opts) if opts["server"] else None
+        try:
+            stats, elapsed = asyncio.run(self._run(usernames, opts))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=10)
+        self._report(stats, elapsed)
+
+    def _start_server(self, opts):
+        port = urllib.parse.urlsplit(opts["base_url"]).port or 8000
+        bind = f"127.0.0.1:{port}"
+        commands = {
+            "gunicorn": ["gunicorn", "GymTracker.wsgi", "-b", bind, "-w", str(opts["workers"])],
+            "uvicorn": ["uvicorn", "GymTracker.asgi:application", "--port", str(port), "--workers", str(opts["workers"])],
+            "runserver": [sys.executable, "manage.py", "runserver", bind, "--noreload"],
+        }
+        try:
+            server = subprocess.Popen(commands[opts["server"]], cwd=settings.BASE_DIR)
+        except FileNotFoundError:
+            raise CommandError(f"{opts['server']} is not installed")
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(opts["base_url"] + "/login/", timeout=1).close()
+                return server
+            except (urllib.error.URLError, OSError):
+                if server.poll() is not None:
+                    raise CommandError(f"{opts['server']} exited with code {server.returncode}")
+                time.sleep(0.2)
+        server.terminate()
+        raise CommandError(f"{opts['server']} did not start on {bind}")
+
+    async def _run(self, usernames, opts):
+        stats = Stats()
+        started = time.monotonic()
+        deadline = started + opts["duration"]
+        with ThreadPoolExecutor(max_workers=len(usernames)) as executor:
+            users = [
+                VirtualUser(opts["base_url"], username, opts["password"], stats, executor, opts["think_time"])
+                for username in usernames
+            ]
+            await asyncio.gather(*(user.run(deadline) for user in users))
+        return stats, time.monotonic() - started
+
+    def _report(self, stats, elapsed):
+        total = sum(len(v) for v in stats.latencies.values())
+        errors = sum(stats.errors.values())
+        if not total:
+            raise CommandError("No requests completed")
+
+        self.stdout.write(f"\n{'endpoint':<16}{'count':>8}{'err%':>8}{'rps':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for name in sorted(stats.latencies):
+            values = stats.latencies[name]
+            self.stdout.write(
+                f"{name:<16}{len(values):>8}{stats.errors[name] / len(values) * 100:>7.1f}%"
+                f"{len(values) / elapsed:>8.1f}"
+                f"{_percentile(values, 50) * 1000:>10.1f}"
+                f"{_percentile(values, 95) * 1000:>10.1f}"
+                f"{_percentile(values, 99) * 1000:>10.1f}"
+            )
+        self.stdout.write(
+            f"\nTotal: {total} requests in {elapsed:.1f} s, "
+            f"{total / elapsed:.1f} req/s, error rate {errors / total * 100:.2f}%"
+        )
@@ -47,7 +47,7 @@ class Command(BaseCommand):
             )
             ex.muscle_group = mg
             ex.is_active = active
-            ex.save(update_fields=["muscle_group", "is_active"])
+            ex.save(update_fields=["muscle_group", "is_active", "updated_at"])
             ex_map[name] = ex
 
         today = timezone.now().date()
@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+
+PROBE = """
+import resource, sys
+import GymTracker.wsgi
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(rss if sys.platform != "darwin" else rss // 1024)
+"""
+
+
+def _parse_importtime(stderr):
+    """Parse ``python -X importtime`` output into {module: (self_us, cumulative_us)}."""
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = "Cold-start a WSGI process and report import time per module and RSS"
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument("--runs", type=int, default=3, help="Cold starts to average")
+
+    def handle(self, *args, **opts):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings.SETTINGS_MODULE)
+        walls, rss_values, runs = [], [], []
+        for _ in range(opts["runs"]):
+            started = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-c", PROBE],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+            )
+            walls.append(time.perf_counter() - started)
+            rss_values.append(int(proc.stdout.strip().splitlines()[-1]))
+            runs.append(_parse_importtime(proc.stderr))
+
+        modules = runs[-1]
+        by_package = defaultdict(int)
+        for name, (self_us, _) in modules.items():
+            by_package[name.split(".")[0]] += self_us
+
+        self.stdout.write(f"Settings: {settings.SETTINGS_MODULE}")
+        self.stdout.write(f"Cold start (avg of {len(walls)}): {sum(walls) / len(walls) * 1000:.0f} ms")
+        self.stdout.write(f"Max RSS: {max(rss_values) / 1024:.1f} MiB")
+        self.stdout.write(f"Modules imported: {len(modules)}")
+
+        self.stdout.write(f"\nTop {opts['top']} modules by cumulative import time:")
+        ranked = sorted(modules.items(), key=lambda item: item[1][1], reverse=True)
+        for name, (self_us, cumulative_us) in ranked[:opts["top"]]:
+            self.stdout.write(f"{cumulative_us / 1000:9.1f} ms  {self_us / 1000:7.1f} ms self  {name}")
+
+        self.stdout.write(f"\nTop {opts['top']} packages by own import time:")
+        for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:opts["top"]]:
+            self.stdout.write(f"{self_us / 1000:9.1f} ms  {package}")
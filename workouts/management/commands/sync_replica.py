@@ -0,0 +1,28 @@
+import sqlite3
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from GymTracker.routers import REPLICA_DB_ALIAS
+
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database into the local replica file (stand-in for replication)"
+
+    def handle(self, *args, **opts):
+        if REPLICA_DB_ALIAS not in connections.databases:
+            raise CommandError("No replica configured (set GYMTRACKER_REPLICA_DB)")
+        primary = connections["default"].settings_dict
+        replica = connections[REPLICA_DB_ALIAS].settings_dict
+        if primary["ENGINE"] != "django.db.backends.sqlite3" or replica["ENGINE"] != "django.db.backends.sqlite3":
+            raise CommandError("sync_replica only supports SQLite; use real replication for Postgres")
+
+        connections[REPLICA_DB_ALIAS].close()
+        source = sqlite3.connect(primary["NAME"])
+        target = sqlite3.connect(replica["NAME"])
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        self.stdout.write(self.style.SUCCESS(f"Replica {replica['NAME']} synced from {primary['NAME']}"))
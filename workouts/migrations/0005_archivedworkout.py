@@ -0,0 +1,35 @@
+# Generated by Django 6.0 on 2026-10-19 07:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0004_exercise_is_active'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedWorkout',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workout_id', models.PositiveIntegerField()),
+                ('date', models.DateField()),
+                ('day_type', models.CharField(default='Other', max_length=30)),
+                ('total_sets', models.PositiveIntegerField(default=0)),
+                ('total_volume', models.FloatField(default=0.0)),
+                ('payload', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_workouts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='archived_user_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'workout_id'), name='uniq_archived_workout_per_user')],
+            },
+        ),
+    ]
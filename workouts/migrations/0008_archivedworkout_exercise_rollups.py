@@ -0,0 +1,46 @@
+# Generated by Django 6.0 on 2026-10-19 08:00
+
+import json
+import zlib
+
+from django.db import migrations, models
+
+
+def fill_exercise_rollups(apps, schema_editor):
+    ArchivedWorkout = apps.get_model('workouts', 'ArchivedWorkout')
+    for archived in ArchivedWorkout.objects.iterator(chunk_size=500):
+        data = json.loads(zlib.decompress(bytes(archived.payload)).decode('utf-8'))
+        rollups = {}
+        for item in data['sets']:
+            weight, reps = float(item['weight']), int(item['reps'])
+            rollup = rollups.setdefault(item['exercise_id'], {
+                'exercise_id': item['exercise_id'],
+                'name': item['exercise_name'],
+                'muscle_group': item['muscle_group'],
+                'sets': 0,
+                'max_weight': weight,
+                'e1rm': 0.0,
+                'volume': 0.0,
+            })
+            rollup['sets'] += 1
+            rollup['max_weight'] = max(rollup['max_weight'], weight)
+            rollup['e1rm'] = max(rollup['e1rm'], weight * (1 + reps / 30))
+            rollup['volume'] += weight * reps
+        archived.exercise_rollups = list(rollups.values())
+        archived.save(update_fields=['exercise_rollups'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0007_sync_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedworkout',
+            name='exercise_rollups',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(fill_exercise_rollups, migrations.RunPython.noop),
+    ]
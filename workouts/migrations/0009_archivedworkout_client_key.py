@@ -0,0 +1,18 @@
+# Generated by Django 6.0 on 2026-10-19 08:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workouts', '0008_archivedworkout_exercise_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedworkout',
+            name='client_key',
+            field=models.UUIDField(blank=True, editable=False, null=True, unique=True),
+        ),
+    ]
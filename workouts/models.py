@@ -20,6 +20,7 @@ class Exercise(models.Model):
         choices=MUSCLE_GROUP_CHOICES,
         default="Other",
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return f"{self.name} ({self.muscle_group})"
@@ -49,9 +50,15 @@ class Workout(models.Model):
     notes = models.TextField(blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    client_key = models.UUIDField(null=True, blank=True, unique=True, editable=False)
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            models.Index(fields=["user", "date"], name="workout_user_date_idx"),
+            models.Index(fields=["date"], name="workout_date_idx"),
+        ]
 
     def __str__(self):
         return f"{self.user.username} – {self.day_type} – {self.date}"
@@ -71,6 +78,47 @@ class SetEntry(models.Model):
     weight = models.FloatField()
     reps = models.PositiveIntegerField()
     notes = models.CharField(max_length=255, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    client_key = models.UUIDField(null=True, blank=True, unique=True, editable=False)
 
     def __str__(self):
         return f"{self.exercise.name}: {self.weight} x {self.reps}"
+
+
+class ArchivedWorkout(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="archived_workouts")
+    workout_id = models.PositiveIntegerField()
+    date = models.DateField()
+    day_type = models.CharField(max_length=30, default="Other")
+    total_sets = models.PositiveIntegerField(default=0)
+    total_volume = models.FloatField(default=0.0)
+    exercise_rollups = models.JSONField(default=list)
+    # Offline-sync key of the archived workout, so replays still resolve it.
+    client_key = models.UUIDField(null=True, blank=True, unique=True, editable=False)
+    payload = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-date"]
+        indexes = [
+            models.Index(fields=["user", "date"], name="archived_user_date_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["user", "workout_id"], name="uniq_archived_workout_per_user")
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} – {self.day_type} – {self.date} (archived)"
+
+
+class HistoryVersion(models.Model):
+    """
+    Per-user counter bumped on every change to the set history; keys the
+    progress caches and tells a snapshot built elsewhere that it is stale.
+    """
+    # No FK: the counter is bumped on commit, possibly after the user is gone.
+    user_id = models.IntegerField(primary_key=True)
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"history v{self.version} (user {self.user_id})"
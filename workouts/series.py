@@ -0,0 +1,108 @@
+"""
+Per-day exercise series (max weight, estimated 1RM, volume) for the
+progress charts. Several exercises are fetched with one grouped query
+(plus the archived per-exercise rollups), cached per exercise and pivoted
+onto a shared date axis.
+"""
+from django.core.cache import cache
+from django.db import router
+from django.db.models import F, FloatField, Max, Sum
+from django.db.models.functions import Cast
+
+from .models import ArchivedWorkout, SetEntry
+from . import snapshot
+
+
+MAX_COMPARED_EXERCISES = 6
+METRICS = ("max_weight", "e1rm", "volume")
+
+
+def _cache_key(user_id, exercise_id, version):
+    return f"progress:series:{user_id}:{exercise_id}:{version}"
+
+
+def _query(user_id, exercise_ids):
+    reps = Cast(F("reps"), FloatField())
+    # From the primary, like the version the result is cached under: rows
+    # from a lagging replica would be cached as current.
+    rows = (
+        SetEntry.objects
+        .using(router.db_for_write(SetEntry))
+        .filter(workout__user_id=user_id, exercise_id__in=exercise_ids)
+        .values("exercise_id", "workout__date")
+        .annotate(
+            max_weight=Max("weight"),
+            # Epley: weight * (1 + reps / 30)
+            e1rm=Max(F("weight") * (reps / 30.0 + 1.0), output_field=FloatField()),
+            volume=Sum(F("weight") * reps, output_field=FloatField()),
+        )
+        .order_by("exercise_id", "workout__date")
+    )
+    points = {exercise_id: {} for exercise_id in exercise_ids}
+    for row in rows:
+        points[row["exercise_id"]][row["workout__date"]] = [
+            float(row["max_weight"]), float(row["e1rm"]), float(row["volume"])
+        ]
+
+    # Archived workouts only keep per-exercise rollups; merge them per day.
+    archived = (
+        ArchivedWorkout.objects
+        .using(router.db_for_write(ArchivedWorkout))
+        .filter(user_id=user_id)
+        .order_by()
+        .values_list("date", "exercise_rollups")
+    )
+    for day, rollups in archived:
+        for rollup in rollups:
+            if rollup["exercise_id"] not in points:
+                continue
+            point = points[rollup["exercise_id"]].get(day)
+            if point is None:
+                points[rollup["exercise_id"]][day] = [rollup["max_weight"], rollup["e1rm"], rollup["volume"]]
+            else:
+                point[0] = max(point[0], rollup["max_weight"])
+                point[1] = max(point[1], rollup["e1rm"])
+                point[2] += rollup["volume"]
+
+    return {
+        exercise_id: {
+            day.isoformat(): tuple(round(value, 1) for value in point)
+            for day, point in sorted(days.items())
+        }
+        for exercise_id, days in points.items()
+    }
+
+
+def exercise_series(user_id, exercise_ids, version=None):
+    """Return {exercise_id: {iso_day: (max_weight, e1rm, volume)}}."""
+    if version is None:
+        version = snapshot.history_version(user_id)
+    keys = {exercise_id: _cache_key(user_id, exercise_id, version) for exercise_id in exercise_ids}
+    cached = cache.get_many(keys.values())
+
+    series = {}
+    missing = []
+    for exercise_id, key in keys.items():
+        if key in cached:
+            series[exercise_id] = cached[key]
+        else:
+            missing.append(exercise_id)
+
+    if missing:
+        fetched = _query(user_id, missing)
+        cache.set_many({keys[exercise_id]: points for exercise_id, points in fetched.items()})
+        series.update(fetched)
+    return series
+
+
+def align(series, exercises):
+    """Pivot per-exercise points onto one sorted date axis; gaps are None."""
+    days = sorted({day for points in series.values() for day in points})
+    aligned = []
+    for exercise in exercises:
+        points = series.get(exercise.id, {})
+        row = {"id": exercise.id, "name": exercise.name}
+        for index, metric in enumerate(METRICS):
+            row[metric] = [points[day][index] if day in points else None for day in days]
+        aligned.append(row)
+    return {"days": days, "series": aligned}
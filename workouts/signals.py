@@ -0,0 +1,46 @@
+"""
+Keep the per-user history snapshot in sync with SetEntry/Workout writes,
+wherever they come from (views, sync, admin, shell, cascades).
+
+Work runs on commit so a rolled-back write never touches the snapshot and
+a rebuild never misses a row that is about to be committed. Invalidations
+are collapsed to one per user per transaction.
+"""
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SetEntry, Workout
+from . import snapshot
+
+
+@receiver(post_save, sender=SetEntry)
+def set_entry_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        transaction.on_commit(partial(snapshot.append, instance))
+    else:
+        snapshot.invalidate_on_commit(workout_id=instance.workout_id)
+
+
+@receiver(post_delete, sender=SetEntry)
+def set_entry_deleted(sender, instance, origin=None, **kwargs):
+    # Deleting a workout or a user: workout_deleted covers it once per workout.
+    if isinstance(origin, (Workout, User)) or getattr(origin, "model", None) in (Workout, User):
+        return
+    snapshot.invalidate_on_commit(workout_id=instance.workout_id)
+
+
+@receiver(post_save, sender=Workout)
+def workout_saved(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        snapshot.invalidate_on_commit(instance.user_id)
+
+
+@receiver(post_delete, sender=Workout)
+def workout_deleted(sender, instance, **kwargs):
+    snapshot.invalidate_on_commit(instance.user_id)
@@ -0,0 +1,296 @@
+"""
+Compact per-user columnar snapshot of set history.
+
+Each user gets a directory with one raw file per column (set id, date
+ordinal, exercise id, weight, reps). Files are loaded memory-mapped, so
+analytics scan contiguous typed arrays instead of building SetEntry
+instances. New sets are appended in place; edits and deletes drop the
+snapshot and it is rebuilt from the database on the next load, or once it
+is older than WORKOUTS_SNAPSHOT_MAX_AGE.
+
+Every change also bumps the user's HistoryVersion row. The snapshot
+records the version it reflects, so one built by another host (or that
+missed an invalidation) is rebuilt, and caches keyed on the version stay
+correct across workers.
+
+Writers (append, rebuild, invalidate) hold an exclusive flock on
+``<user_id>.lock`` next to the directory; readers hold a shared one while
+opening the columns, so they never see a half-written row.
+"""
+import fcntl
+import json
+import mmap
+import os
+import shutil
+import time
+from array import array
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+
+from .models import HistoryVersion, SetEntry, Workout
+
+
+COLUMNS = (
+    ("id", "q"),
+    ("day", "i"),
+    ("exercise_id", "i"),
+    ("weight", "d"),
+    ("reps", "I"),
+)
+META_FILE = "meta.json"
+
+
+def history_version(user_id):
+    """Counter bumped on every change to the user's set history (cache key salt)."""
+    # From the primary: a lagging replica would hand out an old version.
+    version = (
+        HistoryVersion.objects
+        .using(router.db_for_write(HistoryVersion))
+        .filter(user_id=user_id)
+        .values_list("version", flat=True)
+        .first()
+    )
+    return version or 1
+
+
+def _bump_version(user_id):
+    versions = HistoryVersion.objects.using(router.db_for_write(HistoryVersion)).filter(user_id=user_id)
+    if not versions.update(version=F("version") + 1):
+        try:
+            with transaction.atomic(using=versions.db):
+                HistoryVersion.objects.using(versions.db).create(user_id=user_id, version=2)
+        except IntegrityError:
+            versions.update(version=F("version") + 1)
+    return history_version(user_id)
+
+
+def _user_dir(user_id):
+    return os.path.join(settings.WORKOUTS_SNAPSHOT_DIR, str(user_id))
+
+
+def _column_path(user_id, name):
+    return os.path.join(_user_dir(user_id), f"{name}.bin")
+
+
+def _meta_path(user_id):
+    return os.path.join(_user_dir(user_id), META_FILE)
+
+
+@contextmanager
+def _locked(user_id, exclusive=True):
+    os.makedirs(settings.WORKOUTS_SNAPSHOT_DIR, exist_ok=True)
+    lock_path = os.path.join(settings.WORKOUTS_SNAPSHOT_DIR, f"{user_id}.lock")
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _row(set_id, day, exercise_id, weight, reps):
+    return {
+        "id": set_id,
+        "day": day.toordinal(),
+        "exercise_id": exercise_id,
+        "weight": float(weight),
+        "reps": int(reps),
+    }
+
+
+def _write_file(path, write):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def _write_meta(user_id, built_at, version, max_id):
+    meta = json.dumps({"built_at": built_at, "version": version, "max_id": max_id}).encode()
+    _write_file(_meta_path(user_id), lambda f: f.write(meta))
+
+
+def _read_meta(user_id):
+    try:
+        with open(_meta_path(user_id), "rb") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _rebuild(user_id, version=None):
+    # Read before the rows: a change committed in between leaves the snapshot
+    # one version behind, so it is rebuilt again rather than served stale.
+    if version is None:
+        version = history_version(user_id)
+    # Always from the primary: appends after a stale rebuild would never be repaired.
+    rows = (
+        SetEntry.objects
+        .using(router.db_for_write(SetEntry))
+        .filter(workout__user_id=user_id)
+        .order_by("workout__date", "id")
+        .values_list("id", "workout__date", "exercise_id", "weight", "reps")
+    )
+    columns = {name: array(code) for name, code in COLUMNS}
+    for values in rows.iterator(chunk_size=2000):
+        for name, value in _row(*values).items():
+            columns[name].append(value)
+
+    os.makedirs(_user_dir(user_id), exist_ok=True)
+    for name, _ in COLUMNS:
+        _write_file(_column_path(user_id, name), columns[name].tofile)
+    _write_meta(user_id, time.time(), version, max(columns["id"], default=0))
+    return version
+
+
+def rebuild(user_id):
+    with _locked(user_id):
+        _rebuild(user_id)
+
+
+def _contains(user_id, set_id):
+    ids = array("q")
+    with open(_column_path(user_id, "id"), "rb") as f:
+        ids.frombytes(f.read())
+    return set_id in ids
+
+
+def append(set_entry):
+    """Append a freshly created set; no-op if the snapshot is not built yet."""
+    user_id = set_entry.workout.user_id
+    with _locked(user_id):
+        # Bumped under the lock so concurrent appends on this host see
+        # consecutive versions in the order they extend the files.
+        version = _bump_version(user_id)
+        meta = _read_meta(user_id)
+        # Only extend a snapshot that is exactly one change behind; otherwise
+        # it misses other changes too and the next load rebuilds it.
+        if meta is None or meta.get("version") != version - 1:
+            return
+        # A rebuild that ran after the commit may already have picked the set
+        # up. Ids grow, so a set newer than any in the files is known to be
+        # missing; only one committed out of order needs a scan of id.bin.
+        max_id = meta.get("max_id", 0)
+        if set_entry.pk > max_id or not _contains(user_id, set_entry.pk):
+            row = _row(set_entry.pk, set_entry.workout.date, set_entry.exercise_id, set_entry.weight, set_entry.reps)
+            for name, code in COLUMNS:
+                with open(_column_path(user_id, name), "ab") as f:
+                    array(code, [row[name]]).tofile(f)
+        _write_meta(user_id, meta["built_at"], version, max(max_id, set_entry.pk))
+
+
+def invalidate(user_id):
+    _bump_version(user_id)
+    with _locked(user_id):
+        shutil.rmtree(_user_dir(user_id), ignore_errors=True)
+
+
+class _PendingInvalidations:
+    """Users (and workouts, resolved to users on commit) to invalidate once each."""
+
+    def __init__(self, using):
+        self.using = using
+        self.user_ids = set()
+        self.workout_ids = set()
+        self.done = False
+
+    def __call__(self):
+        self.done = True
+        user_ids = set(self.user_ids)
+        if self.workout_ids:
+            user_ids.update(
+                Workout.objects.using(self.using)
+                .filter(pk__in=self.workout_ids)
+                .values_list("user_id", flat=True)
+            )
+        for user_id in sorted(user_ids):
+            invalidate(user_id)
+
+
+def invalidate_on_commit(user_id=None, workout_id=None):
+    """
+    Invalidate the snapshot of ``user_id`` (or of the owner of ``workout_id``)
+    when the current transaction commits, at most once per user however many
+    rows the transaction touched.
+    """
+    connection = transaction.get_connection(router.db_for_write(SetEntry))
+    if not connection.in_atomic_block:
+        pending = _PendingInvalidations(connection.alias)
+    else:
+        pending = getattr(connection, "_snapshot_invalidations", None)
+        # Callbacks of a rolled-back block are discarded: start a new batch.
+        if pending is None or pending.done or not any(entry[1] is pending for entry in connection.run_on_commit):
+            pending = connection._snapshot_invalidations = _PendingInvalidations(connection.alias)
+            transaction.on_commit(pending, using=connection.alias)
+    if user_id is not None:
+        pending.user_ids.add(user_id)
+    if workout_id is not None:
+        pending.workout_ids.add(workout_id)
+    if not connection.in_atomic_block:
+        pending()
+
+
+class HistorySnapshot:
+    def __init__(self, columns, version):
+        self.version = version
+        for name, view in columns.items():
+            setattr(self, name, view)
+
+    def __len__(self):
+        return len(self.day)
+
+
+def _is_fresh(user_id, version):
+    meta = _read_meta(user_id)
+    if meta is None or meta.get("version") != version:
+        return False
+    return time.time() - meta.get("built_at", 0) < settings.WORKOUTS_SNAPSHOT_MAX_AGE
+
+
+def _open_columns(user_id, version=None):
+    if version is not None and not _is_fresh(user_id, version):
+        return None
+    sizes = {}
+    for name, code in COLUMNS:
+        path = _column_path(user_id, name)
+        if not os.path.exists(path):
+            return None
+        sizes[name] = os.path.getsize(path) // array(code).itemsize
+    if len(set(sizes.values())) != 1:
+        return None
+
+    columns, maps = {}, []
+    for name, code in COLUMNS:
+        if not sizes[name]:
+            columns[name] = array(code)
+            continue
+        with open(_column_path(user_id, name), "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        maps.append(mm)
+        columns[name] = memoryview(mm)[:sizes[name] * array(code).itemsize].cast(code)
+    return columns, maps
+
+
+@contextmanager
+def load(user_id):
+    version = history_version(user_id)
+    # The maps stay valid after the lock is released: writers replace files
+    # or append past the mapped length, they never rewrite mapped bytes.
+    with _locked(user_id, exclusive=False):
+        opened = _open_columns(user_id, version)
+    if opened is None:
+        with _locked(user_id):
+            _rebuild(user_id, version)
+            opened = _open_columns(user_id)
+    columns, maps = opened
+    try:
+        yield HistorySnapshot(columns, version)
+    finally:
+        for view in columns.values():
+            if isinstance(view, memoryview):
+                view.release()
+        for mm in maps:
+            mm.close()
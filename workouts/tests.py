@@ -1,3 +1,565 @@
-from django.test import TestCase
+import itertools
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+from io import StringIO
+from unittest import mock
+from datetime import date, timedelta
+from pathlib import Path
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import ArchivedWorkout, Exercise, HistoryVersion, SetEntry, Workout
+from . import archive, deletion, series, snapshot, views
+
+
+BUDGETS_DIR = Path(__file__).resolve().parent / "query_budgets"
+GUARDED_TABLES = {Workout._meta.db_table, SetEntry._meta.db_table}
+
+# FROM "workouts_setentry" U0 / INNER JOIN "workouts_workout" T3
+ALIAS_RE = re.compile(r'(?:FROM|JOIN)\s+"(\w+)"\s+(?:AS\s+)?"?([A-Z]\d+)"?')
+SQLITE_SCAN_RE = re.compile(r"\bSCAN (?:TABLE )?(\w+)")
+POSTGRES_SCAN_RE = re.compile(r"Seq Scan on (\w+)")
+
+
+def full_scans(sql):
+    """Return the guarded tables that ``sql`` reads with a full table scan."""
+    aliases = {alias: table for table, alias in ALIAS_RE.findall(sql)}
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql)
+            plan = [row[-1] for row in cursor.fetchall()]
+            scan_re = SQLITE_SCAN_RE
+        elif connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN " + sql)
+            plan = [row[0] for row in cursor.fetchall()]
+            scan_re = POSTGRES_SCAN_RE
+        else:
+            return []
+    scanned = set()
+    for line in plan:
+        for name in scan_re.findall(line):
+            table = aliases.get(name, name)
+            if table in GUARDED_TABLES:
+                scanned.add(table)
+    return sorted(scanned)
+
+
+class QueryPlanGuardMixin:
+    """
+    Run a view and fail on full scans of SetEntry/Workout or on more queries
+    than recorded in ``query_budgets/<name>.json``.
+
+    Set UPDATE_QUERY_BUDGETS=1 to (re)write the budget files from the
+    observed query counts.
+    """
+
+    def assertQueryPlan(self, name, url, status=200):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status)
+
+        problems = []
+        for query in captured.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT"):
+                continue
+            for table in full_scans(sql):
+                problems.append(f"full scan of {table}: {sql}")
+        self.assertFalse(problems, "\n".join(problems))
+
+        count = len(captured)
+        budget_path = BUDGETS_DIR / f"{name}.json"
+        if os.environ.get("UPDATE_QUERY_BUDGETS"):
+            BUDGETS_DIR.mkdir(exist_ok=True)
+            budget_path.write_text(json.dumps({"max_queries": count}, indent=2) + "\n")
+            return response
+
+        self.assertTrue(budget_path.exists(), f"No query budget for {name}; run with UPDATE_QUERY_BUDGETS=1")
+        budget = json.loads(budget_path.read_text())["max_queries"]
+        queries = "\n".join(q["sql"] for q in captured.captured_queries)
+        self.assertLessEqual(count, budget, f"{name}: {count} queries, budget {budget}\n{queries}")
+        return response
+
+
+class SnapshotDirMixin:
+    """Point WORKOUTS_SNAPSHOT_DIR at a temporary directory for the class."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.snapshot_dir = tempfile.mkdtemp(prefix="gymtracker-snapshots-")
+        cls._snapshot_settings = override_settings(WORKOUTS_SNAPSHOT_DIR=cls.snapshot_dir)
+        cls._snapshot_settings.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls._snapshot_settings.disable()
+        shutil.rmtree(cls.snapshot_dir, ignore_errors=True)
+
+
+class ViewQueryPlanTests(SnapshotDirMixin, QueryPlanGuardMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("lifter", password="pw")
+        other = User.objects.create_user("other", password="pw")
+
+        for owner in (cls.user, other):
+            exercises = [
+                Exercise.objects.create(user=owner, name=name, muscle_group=group)
+                for name, group in [("Bench Press", "Chest"), ("Squat", "Legs"), ("Deadlift", "Back")]
+            ]
+            start = date(2026, 1, 1)
+            for day in range(30):
+                workout = Workout.objects.create(user=owner, date=start + timedelta(days=day), day_type="FullBody")
+                SetEntry.objects.bulk_create([
+                    SetEntry(workout=workout, exercise=exercise, weight=50 + day, reps=5 + n)
+                    for exercise in exercises
+                    for n in range(3)
+                ])
+
+        cls.workout = Workout.objects.filter(user=cls.user).first()
+        cls.exercise_ids = list(Exercise.objects.filter(user=cls.user).values_list("id", flat=True))
+
+    def setUp(self):
+        # Budgets are recorded cold: no cached series, no built snapshot.
+        cache.clear()
+        snapshot.invalidate(self.user.id)
+        self.client.force_login(self.user)
+
+    def test_workout_list(self):
+        self.assertQueryPlan("workout_list", reverse("workout_list"))
+
+    def test_workout_detail(self):
+        self.assertQueryPlan("workout_detail", reverse("workout_detail", kwargs={"pk": self.workout.pk}))
+
+    def test_set_add_form(self):
+        self.assertQueryPlan("set_add", reverse("set_add", kwargs={"workout_id": self.workout.pk}))
+
+    def test_exercise_list(self):
+        self.assertQueryPlan("exercise_list", reverse("exercise_list"))
+
+    def test_progress(self):
+        self.assertQueryPlan("progress", reverse("progress"))
+
+    def test_progress_comparison(self):
+        ids = ",".join(map(str, self.exercise_ids))
+        self.assertQueryPlan("progress_comparison", reverse("progress") + f"?exercise={ids}")
+
+    def test_workout_archive(self):
+        self.assertQueryPlan("workout_archive", reverse("workout_archive"))
+
+
+class SnapshotTests(SnapshotDirMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("lifter", password="pw")
+        cls.exercise = Exercise.objects.create(user=cls.user, name="Squat", muscle_group="Legs")
+        cls.workout = Workout.objects.create(user=cls.user, date=date(2026, 1, 1), day_type="Legs")
+        cls.set_entry = SetEntry.objects.create(workout=cls.workout, exercise=cls.exercise, weight=100, reps=5)
+
+    def setUp(self):
+        snapshot.invalidate(self.user.id)
+
+    def ids(self):
+        with snapshot.load(self.user.id) as history:
+            return sorted(history.id)
+
+    def is_built(self):
+        return os.path.isdir(os.path.join(self.snapshot_dir, str(self.user.id)))
+
+    def test_created_set_is_appended_on_commit(self):
+        self.ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            new = SetEntry.objects.create(workout=self.workout, exercise=self.exercise, weight=105, reps=5)
+            self.assertEqual(self.ids(), [self.set_entry.id])
+        self.assertEqual(self.ids(), [self.set_entry.id, new.id])
+
+    def test_append_skips_sets_already_in_snapshot(self):
+        self.ids()
+        snapshot.append(self.set_entry)
+        self.assertEqual(self.ids(), [self.set_entry.id])
+
+    def test_concurrent_appends_keep_columns_aligned(self):
+        self.ids()
+        sets = [
+            SetEntry(id=10_000 + n, workout=self.workout, exercise=self.exercise, weight=n, reps=n)
+            for n in range(1, 21)
+        ]
+        threads = [threading.Thread(target=snapshot.append, args=(s,)) for s in sets]
+        # The in-memory test database can't take writes from other threads.
+        versions = itertools.count(snapshot.history_version(self.user.id) + 1)
+        with mock.patch.object(snapshot, "_bump_version", side_effect=lambda user_id: next(versions)):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        # Read the files as written: the fake sets are not in the database.
+        columns, maps = snapshot._open_columns(self.user.id)
+        self.assertEqual(len(columns["id"]), 21)
+        rows = dict(zip(columns["id"], columns["reps"]))
+        for view in columns.values():
+            view.release()
+        for mm in maps:
+            mm.close()
+        self.assertEqual(rows, {self.set_entry.id: 5, **{s.id: s.reps for s in sets}})
+
+    def test_edits_outside_views_invalidate(self):
+        for change in (
+            lambda: SetEntry.objects.get(pk=self.set_entry.pk).save(),
+            lambda: Workout.objects.get(pk=self.workout.pk).save(),
+            lambda: SetEntry.objects.filter(pk=self.set_entry.pk).delete(),
+        ):
+            self.ids()
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertFalse(self.is_built())
+
+    def test_cascaded_delete_invalidates(self):
+        self.ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            Workout.objects.filter(pk=self.workout.pk).delete()
+        self.assertFalse(self.is_built())
+        self.assertEqual(self.ids(), [])
+
+    def test_cascaded_delete_stays_cheap(self):
+        counts = []
+        for set_count in (10, 200):
+            workout = Workout.objects.create(user=self.user, date=date(2026, 2, 1))
+            SetEntry.objects.bulk_create([
+                SetEntry(workout=workout, exercise=self.exercise, weight=1, reps=1) for _ in range(set_count)
+            ])
+            with mock.patch.object(snapshot, "invalidate", wraps=snapshot.invalidate) as invalidate:
+                with CaptureQueriesContext(connection) as captured:
+                    with self.captureOnCommitCallbacks(execute=True):
+                        workout.delete()
+            invalidate.assert_called_once_with(self.user.id)
+            counts.append(len(captured))
+        # Only the collector's batched DELETEs grow (100 rows per statement).
+        self.assertLessEqual(counts[1] - counts[0], 2)
+
+    def test_invalidation_survives_rolled_back_block(self):
+        self.ids()
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(ZeroDivisionError):
+                with transaction.atomic():
+                    SetEntry.objects.get(pk=self.set_entry.pk).save()
+                    1 / 0
+            Workout.objects.get(pk=self.workout.pk).save()
+        self.assertFalse(self.is_built())
+
+    def test_append_of_new_set_skips_id_scan(self):
+        self.ids()
+        with mock.patch.object(snapshot, "_contains") as contains:
+            with self.captureOnCommitCallbacks(execute=True):
+                new = SetEntry.objects.create(workout=self.workout, exercise=self.exercise, weight=105, reps=5)
+        contains.assert_not_called()
+        self.assertEqual(self.ids(), [self.set_entry.id, new.id])
+
+    def test_stale_snapshot_is_rebuilt(self):
+        self.ids()
+        # bulk_create sends no signals, like a write the snapshot never heard of.
+        missed = SetEntry.objects.bulk_create([
+            SetEntry(workout=self.workout, exercise=self.exercise, weight=110, reps=3)
+        ])[0]
+        self.assertEqual(self.ids(), [self.set_entry.id])
+        with override_settings(WORKOUTS_SNAPSHOT_MAX_AGE=0):
+            self.assertEqual(self.ids(), [self.set_entry.id, missed.id])
+
+    def test_change_on_another_host_is_picked_up(self):
+        self.ids()
+        missed = SetEntry.objects.bulk_create([
+            SetEntry(workout=self.workout, exercise=self.exercise, weight=110, reps=3)
+        ])[0]
+        # Another host invalidated its own snapshot dir; only the version is shared.
+        HistoryVersion.objects.filter(user_id=self.user.id).update(version=F("version") + 1)
+        self.assertEqual(self.ids(), [self.set_entry.id, missed.id])
+
+    def test_series_cache_follows_history_version(self):
+        before = series.exercise_series(self.user.id, [self.exercise.id])[self.exercise.id]
+        with self.captureOnCommitCallbacks(execute=True):
+            SetEntry.objects.create(workout=self.workout, exercise=self.exercise, weight=140, reps=1)
+        after = series.exercise_series(self.user.id, [self.exercise.id])[self.exercise.id]
+        self.assertEqual(before["2026-01-01"][0], 100.0)
+        self.assertEqual(after["2026-01-01"][0], 140.0)
+
+
+class ArchiveTests(SnapshotDirMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("lifter", password="pw")
+        cls.squat = Exercise.objects.create(user=cls.user, name="Squat", muscle_group="Legs")
+        cls.bench = Exercise.objects.create(user=cls.user, name="Bench Press", muscle_group="Chest")
+        cls.old = Workout.objects.create(user=cls.user, date=date(2024, 1, 1), day_type="FullBody", notes="old")
+        cls.recent = Workout.objects.create(user=cls.user, date=date(2026, 1, 1), day_type="Legs")
+        SetEntry.objects.bulk_create([
+            SetEntry(workout=cls.old, exercise=cls.squat, weight=100, reps=5),
+            SetEntry(workout=cls.old, exercise=cls.squat, weight=120, reps=2),
+            SetEntry(workout=cls.old, exercise=cls.bench, weight=80, reps=8),
+            SetEntry(workout=cls.recent, exercise=cls.squat, weight=110, reps=5),
+        ])
+
+    def setUp(self):
+        cache.clear()
+        snapshot.invalidate(self.user.id)
+        self.client.force_login(self.user)
+
+    def archive_old(self):
+        self.assertEqual(archive.archive_older_than(date(2025, 1, 1)), 1)
+        return ArchivedWorkout.objects.get(workout_id=self.old.id)
+
+    def test_archive_keeps_rollups(self):
+        archived = self.archive_old()
+        self.assertFalse(Workout.objects.filter(pk=self.old.pk).exists())
+        self.assertEqual(SetEntry.objects.filter(workout__user=self.user).count(), 1)
+        self.assertEqual(archived.total_sets, 3)
+        self.assertEqual(archived.total_volume, 100 * 5 + 120 * 2 + 80 * 8)
+        rollups = {r["exercise_id"]: r for r in archived.exercise_rollups}
+        self.assertEqual(rollups[self.squat.id]["sets"], 2)
+        self.assertEqual(rollups[self.squat.id]["max_weight"], 120)
+        self.assertAlmostEqual(rollups[self.squat.id]["e1rm"], 120 * (1 + 2 / 30))
+        self.assertEqual(rollups[self.bench.id]["volume"], 640)
+
+    def test_progress_includes_archived_exercises(self):
+        self.archive_old()
+        response = self.client.get(reverse("progress"))
+        rows = {row["exercise__name"]: row for row in response.context["by_exercise"]}
+        self.assertEqual(rows["Squat"]["total_sets"], 3)
+        self.assertEqual(rows["Squat"]["max_weight"], 120)
+        self.assertEqual(rows["Bench Press"]["total_sets"], 1)
+        self.assertEqual(sum(day["total_sets"] for day in response.context["by_day"]), 4)
+
+        points = series.exercise_series(self.user.id, [self.squat.id])[self.squat.id]
+        self.assertEqual(points["2024-01-01"], (120.0, 128.0, 740.0))
+        self.assertEqual(points["2026-01-01"][0], 110.0)
+
+    def test_progress_mid_run_does_not_double_count(self):
+        Workout.objects.create(user=self.user, date=date(2024, 6, 1), day_type="Legs")
+        self.client.get(reverse("progress"))  # snapshot built with the old sets
+        real_archive = archive.archive_workout
+        seen = []
+
+        def archive_and_look(workout):
+            # Each workout commits on its own during a real run.
+            with self.captureOnCommitCallbacks(execute=True):
+                archived = real_archive(workout)
+            seen.append(sum(day["total_sets"] for day in self.client.get(reverse("progress")).context["by_day"]))
+            return archived
+
+        with mock.patch.object(archive, "archive_workout", side_effect=archive_and_look):
+            archive.archive_older_than(date(2025, 1, 1))
+        self.assertEqual(seen, [4, 4])
+
+    def test_restore_round_trip(self):
+        before = sorted(self.old.sets.values_list("exercise_id", "weight", "reps", "notes"))
+        archived = self.archive_old()
+        workout = archive.restore(archived)
+        self.assertEqual(workout.pk, self.old.pk)
+        self.assertEqual(workout.notes, "old")
+        self.assertEqual(sorted(workout.sets.values_list("exercise_id", "weight", "reps", "notes")), before)
+        self.assertFalse(ArchivedWorkout.objects.exists())
+
+    def test_detail_restores_archived_workout(self):
+        self.archive_old()
+        response = self.client.get(reverse("workout_detail", kwargs={"pk": self.old.pk}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["total_sets"], 3)
+
+
+class DeleteUserTests(SnapshotDirMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("leaving", password="pw")
+        cls.other = User.objects.create_user("staying", password="pw")
+        for owner in (cls.user, cls.other):
+            exercise = Exercise.objects.create(user=owner, name="Squat", muscle_group="Legs")
+            for day in range(5):
+                workout = Workout.objects.create(user=owner, date=date(2024, 1, 1) + timedelta(days=day))
+                SetEntry.objects.bulk_create([
+                    SetEntry(workout=workout, exercise=exercise, weight=100, reps=reps) for reps in range(1, 4)
+                ])
+        archive.archive_workout(Workout.objects.filter(user=cls.user).earliest("date"))
+
+    def assertOtherUserIntact(self):
+        self.assertEqual(Workout.objects.filter(user=self.other).count(), 5)
+        self.assertEqual(SetEntry.objects.filter(workout__user=self.other).count(), 15)
+        self.assertEqual(Exercise.objects.filter(user=self.other).count(), 1)
+
+    def test_deletes_everything_in_chunks(self):
+        with snapshot.load(self.user.id):
+            pass
+        calls = []
+        deletion.delete_user(self.user, chunk_size=2, progress=lambda *args: calls.append(args))
+
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Workout.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(SetEntry.objects.filter(workout__user_id=self.user.pk).exists())
+        self.assertFalse(Exercise.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(ArchivedWorkout.objects.filter(user_id=self.user.pk).exists())
+        self.assertFalse(os.path.isdir(os.path.join(self.snapshot_dir, str(self.user.pk))))
+        self.assertOtherUserIntact()
+        self.assertEqual(calls, [
+            ("workouts", 2, 4), ("workouts", 4, 4),
+            ("archived", 1, 1),
+            ("exercises", 1, 1),
+            ("user", 1, 1),
+        ])
+
+    def test_queries_do_not_grow_with_sets(self):
+        workout = Workout.objects.filter(user=self.user).first()
+        exercise = Exercise.objects.get(user=self.user)
+        SetEntry.objects.bulk_create([SetEntry(workout=workout, exercise=exercise, weight=1, reps=1) for _ in range(200)])
+        # Same shape as self.user (4 workouts, 1 archived) minus the 200 sets.
+        archive.archive_workout(Workout.objects.filter(user=self.other).earliest("date"))
+        with CaptureQueriesContext(connection) as few:
+            deletion.delete_user(self.other, chunk_size=10)
+        with CaptureQueriesContext(connection) as many:
+            deletion.delete_user(self.user, chunk_size=10)
+        self.assertEqual(len(many), len(few))
+
+    def test_command(self):
+        out = StringIO()
+        call_command("delete_user", "leaving", chunk_size=3, stdout=out)
+        self.assertIn("workouts: 3/4", out.getvalue())
+        self.assertFalse(User.objects.filter(username="leaving").exists())
+        self.assertOtherUserIntact()
+
+
+class SyncTests(SnapshotDirMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("lifter", password="pw")
+        cls.exercise = Exercise.objects.create(user=cls.user, name="Squat", muscle_group="Legs")
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.workout_key = str(uuid.uuid4())
+        self.set_key = str(uuid.uuid4())
+
+    def sync(self, **payload):
+        return self.client.post(reverse("sync"), json.dumps(payload), content_type="application/json")
+
+    def batch(self):
+        return {
+            "workouts": [{"key": self.workout_key, "date": "2026-02-01", "day_type": "Legs_Shoulders", "notes": ""}],
+            "sets": [{
+                "key": self.set_key, "workout_key": self.workout_key,
+                "exercise": self.exercise.id, "weight": 100, "reps": 5, "notes": "",
+            }],
+        }
+
+    def test_replay_is_idempotent(self):
+        first = self.sync(**self.batch())
+        self.assertEqual(first.status_code, 200, first.content)
+        second = self.sync(**self.batch())
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(first.json()["applied"], second.json()["applied"])
+        self.assertEqual(Workout.objects.count(), 1)
+        self.assertEqual(SetEntry.objects.count(), 1)
+
+    def test_concurrent_replay_is_retried(self):
+        real_apply = views._apply
+        calls = []
+
+        def racing_apply(*args):
+            calls.append(args)
+            if len(calls) == 1:
+                # The other request commits the same batch first.
+                real_apply(*args)
+                raise IntegrityError("duplicate client_key")
+            return real_apply(*args)
+
+        with mock.patch.object(views, "_apply", side_effect=racing_apply):
+            response = self.sync(**self.batch())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(set(response.json()["applied"]["sets"]), {self.set_key})
+        self.assertEqual(SetEntry.objects.count(), 1)
+
+    def test_bad_references_are_rejected(self):
+        for ref in ({"workout": "abc"}, {"workout": [1]}, {"workout_key": "not-a-uuid"}):
+            response = self.sync(sets=[{"key": self.set_key, "exercise": self.exercise.id, "weight": 1, "reps": 1, **ref}])
+            self.assertEqual(response.status_code, 400, ref)
+        response = self.sync(sets=[{"key": self.set_key, "workout": 999, "exercise": self.exercise.id, "weight": 1, "reps": 1}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["rejected"]["sets"], {self.set_key: "unknown workout"})
+        self.assertFalse(SetEntry.objects.exists())
+
+    def test_unappliable_sets_are_rejected_per_item(self):
+        retired = Exercise.objects.create(user=self.user, name="Good morning", muscle_group="Legs", is_active=False)
+        batch = self.batch()
+        item = batch["sets"][0]
+        bad = {
+            str(uuid.uuid4()): {**item, "exercise": retired.id},
+            str(uuid.uuid4()): {**item, "exercise": 999},
+            str(uuid.uuid4()): {**item, "reps": -1},
+        }
+        batch["sets"] += [{**bad_item, "key": key} for key, bad_item in bad.items()]
+        for _ in range(2):
+            response = self.sync(**batch)
+            self.assertEqual(response.status_code, 200, response.content)
+            self.assertEqual(set(response.json()["applied"]["sets"]), {self.set_key})
+            rejected = response.json()["rejected"]["sets"]
+            self.assertEqual(set(rejected), set(bad))
+        self.assertEqual(list(rejected.values())[:2], ["exercise is archived", "unknown exercise"])
+        self.assertEqual(SetEntry.objects.count(), 1)
+
+    def test_set_batch_queries_do_not_grow(self):
+        def post(count):
+            batch = self.batch()
+            batch["workouts"][0]["key"] = self.workout_key = str(uuid.uuid4())
+            batch["sets"] = [
+                {**batch["sets"][0], "key": str(uuid.uuid4()), "workout_key": self.workout_key}
+                for _ in range(count)
+            ]
+            with CaptureQueriesContext(connection) as queries, self.captureOnCommitCallbacks(execute=True):
+                response = self.sync(**batch)
+            self.assertEqual(len(response.json()["applied"]["sets"]), count)
+            return len(queries)
+
+        with mock.patch.object(snapshot, "invalidate", wraps=snapshot.invalidate) as invalidate:
+            few, many = post(10), post(300)
+        # Only the INSERT is split, into batches of SQLite's parameter limit.
+        self.assertLessEqual(many - few, 2)
+        self.assertEqual(invalidate.call_count, 2)
+        self.assertEqual(SetEntry.objects.count(), 310)
+
+    def test_replay_after_archiving(self):
+        applied = self.sync(**self.batch()).json()["applied"]
+        archive.archive_older_than(date(2027, 1, 1))
+        self.assertFalse(Workout.objects.exists())
+
+        response = self.sync(**self.batch())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["applied"], applied)
+        self.assertEqual(SetEntry.objects.count(), 1)
+        restored = Workout.objects.get()
+        self.assertEqual(str(restored.client_key), self.workout_key)
+        self.assertEqual(str(restored.sets.get().client_key), self.set_key)
+
+    def test_token_covers_returned_changes(self):
+        data = self.sync(**self.batch()).json()
+        newest = max(row["updated_at"] for row in data["changes"]["sets"] + data["changes"]["workouts"])
+        self.assertEqual(data["token"][:23], newest[:23])
+
+        again = self.sync(since=data["token"]).json()
+        self.assertEqual(again["token"], data["token"])
+        # Rows near the token are re-sent rather than risked being skipped.
+        self.assertEqual(len(again["changes"]["sets"]), 1)
+
+        empty = self.sync(since="2030-01-01T00:00:00+00:00").json()
+        self.assertEqual(empty["changes"]["sets"], [])
+        self.assertEqual(empty["token"], "2030-01-01T00:00:00+00:00")
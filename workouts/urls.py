@@ -14,6 +14,9 @@ from .views import (
     ExerciseArchiveView,
     ExerciseUnarchiveView,
     ProgressView,
+    ArchivedWorkoutListView,
+    ArchivedWorkoutRestoreView,
+    sync_view,
     home_view
 )
 
@@ -24,6 +27,8 @@ urlpatterns = [
     path('workout/add/', WorkoutCreateView.as_view(), name='workout_add'),
     path('workout/<int:pk>/edit/', WorkoutUpdateView.as_view(), name='workout_edit'),
     path('workout/<int:pk>/delete/', WorkoutDeleteView.as_view(), name='workout_delete'),
+    path('workouts/archive/', ArchivedWorkoutListView.as_view(), name='workout_archive'),
+    path('workouts/archive/<int:pk>/restore/', ArchivedWorkoutRestoreView.as_view(), name='workout_restore'),
 
     path('workout/<int:workout_id>/set/add/', SetEntryCreateView.as_view(), name='set_add'),
     path('set/<int:pk>/delete/', SetEntryDeleteView.as_view(), name='set_delete'),
@@ -32,6 +37,7 @@ urlpatterns = [
     path('exercises/add/', ExerciseCreateView.as_view(), name='exercise_add'),
     path("set/<int:pk>/edit/", SetEntryUpdateView.as_view(), name="set_edit"),
     path("progress/", ProgressView.as_view(), name="progress"),
+    path("api/sync/", sync_view, name="sync"),
     path("exercises/<int:pk>/delete/", ExerciseDeleteView.as_view(),name="exercise_delete"),
     path("exercises/<int:pk>/archive/", ExerciseArchiveView.as_view(), name="exercise_archive"),
     path("exercises/<int:pk>/delete/", ExerciseDeleteView.as_view(), name="exercise_delete"),
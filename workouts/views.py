@@ -1,28 +1,32 @@
-from django.shortcuts import render
-from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
-from django.urls import reverse_lazy, reverse
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count, Sum, F, Max, FloatField
-from django.db.models.functions import Cast
-from django.db.models.expressions import ExpressionWrapper
-from django.db.models.functions import TruncDate
-from .models import Workout, SetEntry, Exercise
-from django.shortcuts import get_object_or_404, redirect
-from collections import OrderedDict
+import json
+import uuid
 from datetime import date, timedelta
-from django.utils import timezone
+
 from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Max
 from django.db.models.deletion import ProtectedError
-import json
-from django.utils import timezone
+from django.forms import modelform_factory
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse_lazy, reverse
+from django.utils.dateparse import parse_datetime
+from django.views.decorators.http import require_POST
+from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 
+from GymTracker.routers import ReadReplicaMixin
 
-class WorkoutListView(LoginRequiredMixin, ListView):
+from .models import Workout, SetEntry, Exercise, ArchivedWorkout
+from . import archive, deletion, series, snapshot
+
+
+class WorkoutListView(LoginRequiredMixin, ReadReplicaMixin, ListView):
     model = Workout
     template_name = 'workouts/workout_list.html'
 
     def get_queryset(self):
-        return Workout.objects.filter(user=self.request.user)
+        return Workout.objects.filter(user=self.request.user).annotate(set_count=Count("sets"))
 
 
 
@@ -33,17 +37,27 @@ class WorkoutDetailView(LoginRequiredMixin, DetailView):
     def get_queryset(self):
         return Workout.objects.filter(user=self.request.user)
 
+    def get_object(self, queryset=None):
+        try:
+            return super().get_object(queryset)
+        except Http404:
+            archived = ArchivedWorkout.objects.filter(
+                user=self.request.user, workout_id=self.kwargs["pk"]
+            ).first()
+            if archived is None:
+                raise
+            return archive.restore(archived)
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         workout = self.object
 
-        sets_qs = workout.sets.select_related('exercise')
+        sets = list(workout.sets.select_related('exercise').order_by('id'))
 
-        context['unique_exercises'] = (
-            sets_qs.values('exercise_id').distinct().count()
-        )
-        context['total_sets'] = sets_qs.count()
-        context["total_volume"] = round(sum(s.weight * s.reps for s in sets_qs), 2)
+        context['sets'] = sets
+        context['unique_exercises'] = len({s.exercise_id for s in sets})
+        context['total_sets'] = len(sets)
+        context["total_volume"] = round(sum(s.weight * s.reps for s in sets), 2)
         return context
     
 
@@ -76,6 +90,11 @@ class WorkoutDeleteView(DeleteView):
     def get_queryset(self):
         return Workout.objects.filter(user=self.request.user)
 
+    def form_valid(self, form):
+        success_url = self.get_success_url()
+        deletion.delete_workout(self.object)
+        return HttpResponseRedirect(success_url)
+
 class SetEntryCreateView(LoginRequiredMixin, CreateView):
     model = SetEntry
     fields = ['exercise', 'weight', 'reps', 'notes']
@@ -143,7 +162,7 @@ class SetEntryUpdateView(LoginRequiredMixin, UpdateView):
         return form
 
 
-class ExerciseListView(LoginRequiredMixin, ListView):
+class ExerciseListView(LoginRequiredMixin, ReadReplicaMixin, ListView):
     model = Exercise
     template_name = 'workouts/exercise_list.html'
     def get_queryset(self):
@@ -204,7 +223,7 @@ class ExerciseArchiveView(LoginRequiredMixin, UpdateView):
     def post(self, request, *args, **kwargs):
         ex = self.get_object()
         ex.is_active = False
-        ex.save(update_fields=["is_active"])
+        ex.save(update_fields=["is_active", "updated_at"])
         messages.success(request, f"Упражнение «{ex.name}» архивировано.")
         return redirect("exercise_list")
 
@@ -220,46 +239,50 @@ class ExerciseUnarchiveView(LoginRequiredMixin, UpdateView):
     def post(self, request, *args, **kwargs):
         ex = self.get_object()
         ex.is_active = True
-        ex.save(update_fields=["is_active"])
+        ex.save(update_fields=["is_active", "updated_at"])
         messages.success(request, f"Упражнение «{ex.name}» возвращено из архива.")
         return redirect("exercise_list")
     
-class ProgressView(LoginRequiredMixin, TemplateView):
+class ProgressView(LoginRequiredMixin, ReadReplicaMixin, TemplateView):
     template_name = "workouts/progress.html"
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         user = self.request.user
 
-        sets_qs = (
-            SetEntry.objects
-            .filter(workout__user=user)
-            .select_related("workout", "exercise")
-        )
-
-        by_day_map = OrderedDict()
+        sets_qs = SetEntry.objects.filter(workout__user=user)
 
-        for s in sets_qs:
-            d = s.workout.date
-            vol = float(s.weight) * int(s.reps)
+        by_day_map = {}
 
-            if d not in by_day_map:
-                by_day_map[d] = {
-                    "day": d,
-                    "total_sets": 0,
-                    "total_volume": 0.0,
-                }
+        with snapshot.load(user.id) as history:
+            version = history.version
+            for day, weight, reps in zip(history.day, history.weight, history.reps):
+                totals = by_day_map.get(day)
+                if totals is None:
+                    totals = by_day_map[day] = [0, 0.0]
+                totals[0] += 1
+                totals[1] += weight * reps
 
-            by_day_map[d]["total_sets"] += 1
-            by_day_map[d]["total_volume"] += vol
+        archived_rollups = (
+            ArchivedWorkout.objects
+            .filter(user=user)
+            .values_list("date", "total_sets", "total_volume", "exercise_rollups")
+        )
+        archived_exercises = []
+        for day, total_sets, total_volume, rollups in archived_rollups:
+            totals = by_day_map.setdefault(day.toordinal(), [0, 0.0])
+            totals[0] += total_sets
+            totals[1] += total_volume
+            archived_exercises.extend(rollups)
 
         by_day = []
-        for d, v in by_day_map.items():
+        for day in sorted(by_day_map):
+            total_sets, total_volume = by_day_map[day]
             by_day.append({
-                "day": d,
-                "total_sets": v["total_sets"],
-                "total_volume_tons": round(v["total_volume"] / 1000, 2),
-                "avg_volume": round(v["total_volume"] / max(v["total_sets"], 1), 1),
+                "day": date.fromordinal(day),
+                "total_sets": total_sets,
+                "total_volume_tons": round(total_volume / 1000, 2),
+                "avg_volume": round(total_volume / max(total_sets, 1), 1),
             })
 
         ctx["by_day"] = by_day
@@ -267,48 +290,43 @@ class ProgressView(LoginRequiredMixin, TemplateView):
             [{"day": x["day"].isoformat(), "total_volume_tons": x["total_volume_tons"]} for x in by_day]
         )
 
-        volume_expr = ExpressionWrapper(
-            Cast(F("weight"), FloatField()) * Cast(F("reps"), FloatField()),
-            output_field=FloatField()
-        )
-
-        ctx["by_exercise"] = (
-            sets_qs
-            .values("exercise__name", "exercise__muscle_group")
+        by_exercise = {
+            row["exercise_id"]: row
+            for row in sets_qs
+            .values("exercise_id", "exercise__name", "exercise__muscle_group")
             .annotate(
                 total_sets=Count("id"),
                 max_weight=Max("weight"),
             )
-            .order_by("exercise__muscle_group", "exercise__name")
+            .order_by()
+        }
+        for rollup in archived_exercises:
+            row = by_exercise.setdefault(rollup["exercise_id"], {
+                "exercise_id": rollup["exercise_id"],
+                "exercise__name": rollup["name"],
+                "exercise__muscle_group": rollup["muscle_group"],
+                "total_sets": 0,
+                "max_weight": rollup["max_weight"],
+            })
+            row["total_sets"] += rollup["sets"]
+            row["max_weight"] = max(row["max_weight"], rollup["max_weight"])
+        ctx["by_exercise"] = sorted(
+            by_exercise.values(), key=lambda row: (row["exercise__muscle_group"], row["exercise__name"])
         )
 
         exercises = Exercise.objects.filter(user=user, is_active=True).order_by("muscle_group", "name")
         ctx["exercises"] = exercises
 
-        selected_ex_id = self.request.GET.get("exercise")
-        if not selected_ex_id and exercises.exists():
-            selected_ex_id = str(exercises.first().id)
-
-        ctx["selected_exercise_id"] = selected_ex_id
+        selected_ids = self.get_selected_exercise_ids()
+        selected = [ex for ex in exercises if ex.id in selected_ids]
+        if not selected_ids and exercises:
+            selected = [exercises[0]]
 
-        chart_points = []
+        ctx["selected_exercise_ids"] = [ex.id for ex in selected]
 
-        if selected_ex_id:
-            series = (
-                sets_qs
-                .filter(exercise_id=int(selected_ex_id))
-                .values("workout__date")
-                .annotate(max_weight=Max("weight"))
-                .order_by("workout__date")
-            )
-
-            chart_points = [
-                {"day": r["workout__date"].isoformat(), "max_weight": float(r["max_weight"])}
-                for r in series
-            ]
-
-        ctx["exercise_series"] = chart_points
-        ctx["exercise_series_json"] = json.dumps(chart_points)
+        comparison = series.align(series.exercise_series(user.id, [ex.id for ex in selected], version), selected)
+        ctx["exercise_series"] = comparison["days"]
+        ctx["exercise_series_json"] = json.dumps(comparison)
         total_workout_days = len(by_day)
         total_sets_all = sum(x["total_sets"] for x in by_day)
         total_volume_tons_all = sum(x["total_volume_tons"] for x in by_day)
@@ -322,5 +340,252 @@ class ProgressView(LoginRequiredMixin, TemplateView):
 
         return ctx
 
+    def get_selected_exercise_ids(self):
+        """Accept both ?exercise=1,2,3 and repeated ?exercise=1&exercise=2."""
+        ids = []
+        for value in self.request.GET.getlist("exercise"):
+            for part in value.split(","):
+                if part.strip().isdigit() and int(part) not in ids:
+                    ids.append(int(part))
+        return ids[:series.MAX_COMPARED_EXERCISES]
+
+class ArchivedWorkoutListView(LoginRequiredMixin, ReadReplicaMixin, ListView):
+    model = ArchivedWorkout
+    template_name = "workouts/archived_workout_list.html"
+    paginate_by = 50
+
+    def get_queryset(self):
+        return ArchivedWorkout.objects.filter(user=self.request.user).defer("payload")
+
+
+class ArchivedWorkoutRestoreView(LoginRequiredMixin, DetailView):
+    model = ArchivedWorkout
+    http_method_names = ["post"]
+
+    def get_queryset(self):
+        return ArchivedWorkout.objects.filter(user=self.request.user)
+
+    def post(self, request, *args, **kwargs):
+        workout = archive.restore(self.get_object())
+        messages.success(request, f"Тренировка от {workout.date:%d.%m.%Y} восстановлена из архива.")
+        return redirect("workout_detail", pk=workout.pk)
+
+SYNC_MAX_BATCH = 500
+# Changes are re-sent from this far before the token: a row stamped just
+# before the token whose transaction committed after it is not missed.
+SYNC_OVERLAP = timedelta(minutes=2)
+
+WorkoutSyncForm = modelform_factory(Workout, fields=["date", "day_type", "notes"])
+SetEntrySyncForm = modelform_factory(SetEntry, fields=["weight", "reps", "notes"])
+
+
+class SyncError(Exception):
+    pass
+
+
+def _client_key(item):
+    try:
+        return uuid.UUID(str(item.get("key")))
+    except ValueError:
+        raise SyncError(f"Invalid key: {item.get('key')!r}")
+
+
+def _workout_ref(item):
+    if item.get("workout") is not None:
+        try:
+            return ("pk", int(item["workout"]))
+        except (TypeError, ValueError):
+            raise SyncError(f"Invalid workout id: {item['workout']!r}")
+    return ("client_key", _client_key({"key": item.get("workout_key")}))
+
+
+def _find_workout(user, field, value):
+    workout = Workout.objects.filter(user=user, **{field: value}).first()
+    if workout is None:
+        # The client still refers to it, so bring an archived workout back.
+        archived_field = "workout_id" if field == "pk" else field
+        archived = ArchivedWorkout.objects.filter(user=user, **{archived_field: value}).first()
+        if archived is not None:
+            workout = archive.restore(archived)
+    return workout
+
+
+def _apply_workouts(user, items):
+    applied = {}
+    keys = [_client_key(item) for item in items]
+    existing = {
+        key: (user_id, pk)
+        for key, user_id, pk in Workout.objects.filter(client_key__in=keys).values_list("client_key", "user_id", "pk")
+    }
+    existing.update(
+        (key, (user_id, workout_id))
+        for key, user_id, workout_id in ArchivedWorkout.objects
+        .filter(client_key__in=keys)
+        .values_list("client_key", "user_id", "workout_id")
+    )
+    for key, item in zip(keys, items):
+        if key in existing:
+            owner_id, pk = existing[key]
+            if owner_id != user.id:
+                raise SyncError(f"Key already used: {key}")
+            applied[str(key)] = pk
+            continue
+        form = WorkoutSyncForm(item)
+        if not form.is_valid():
+            raise SyncError(f"Workout {key}: {form.errors.as_json()}")
+        form.instance.user = user
+        form.instance.client_key = key
+        applied[str(key)] = form.save().pk
+    return applied
+
+
+def _exercise_id(item):
+    try:
+        return int(item.get("exercise"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _apply_sets(user, items):
+    """
+    Insert new sets in one statement. Returns ``(applied, rejected)``: a set
+    that can never be applied (unknown workout, archived exercise, invalid
+    values) is reported under its key instead of failing the whole batch.
+    """
+    applied, rejected = {}, {}
+    keys = [_client_key(item) for item in items]
+    refs = [_workout_ref(item) for item in items]
+    # Resolve workouts first: restoring an archived one brings its sets (and keys) back.
+    workouts = {ref: _find_workout(user, *ref) for ref in set(refs)}
+    exercises = Exercise.objects.filter(user=user).in_bulk(
+        {exercise_id for exercise_id in map(_exercise_id, items) if exercise_id is not None}
+    )
+    existing = {
+        key: (user_id, pk)
+        for key, user_id, pk in SetEntry.objects
+        .filter(client_key__in=keys)
+        .values_list("client_key", "workout__user_id", "pk")
+    }
+    new_sets = []
+    for key, ref, item in zip(keys, refs, items):
+        if key in existing:
+            owner_id, pk = existing[key]
+            if owner_id != user.id:
+                raise SyncError(f"Key already used: {key}")
+            applied[str(key)] = pk
+            continue
+        exercise = exercises.get(_exercise_id(item))
+        form = SetEntrySyncForm(item)
+        if workouts[ref] is None:
+            rejected[str(key)] = "unknown workout"
+        elif exercise is None:
+            rejected[str(key)] = "unknown exercise"
+        elif not exercise.is_active:
+            rejected[str(key)] = "exercise is archived"
+        elif not form.is_valid():
+            rejected[str(key)] = form.errors.as_json()
+        else:
+            form.instance.workout = workouts[ref]
+            form.instance.exercise = exercise
+            form.instance.client_key = key
+            new_sets.append(form.instance)
+
+    # No post_save signals here: the snapshot is invalidated once per batch.
+    for set_entry in SetEntry.objects.bulk_create(new_sets):
+        applied[str(set_entry.client_key)] = set_entry.pk
+    if new_sets:
+        snapshot.invalidate_on_commit(user.id)
+    return applied, rejected
+
+
+def _apply(user, workouts, sets):
+    with transaction.atomic():
+        return _apply_workouts(user, workouts), *_apply_sets(user, sets)
+
+
+def _changes_since(user, since):
+    workouts = Workout.objects.filter(user=user)
+    sets = SetEntry.objects.filter(workout__user=user)
+    exercises = Exercise.objects.filter(user=user)
+    if since is not None:
+        workouts = workouts.filter(updated_at__gt=since - SYNC_OVERLAP)
+        sets = sets.filter(updated_at__gt=since - SYNC_OVERLAP)
+        exercises = exercises.filter(updated_at__gt=since - SYNC_OVERLAP)
+    return {
+        "workouts": list(workouts.order_by().values(
+            "id", "client_key", "date", "day_type", "notes", "updated_at"
+        )),
+        "sets": list(sets.order_by().values(
+            "id", "client_key", "workout_id", "exercise_id", "weight", "reps", "notes", "updated_at"
+        )),
+        "exercises": list(exercises.order_by().values(
+            "id", "name", "muscle_group", "is_active", "updated_at"
+        )),
+    }
+
+
+@require_POST
+def sync_view(request):
+    """
+    Batched offline sync.
+
+    Body: {"since": <token|null>, "workouts": [{"key": uuid, "date", "day_type", "notes"}],
+           "sets": [{"key": uuid, "workout": id | "workout_key": uuid, "exercise", "weight", "reps", "notes"}]}
+
+    New rows are applied in one transaction; keys already seen are skipped,
+    so replaying a batch is harmless. Sets that can never be applied are
+    listed under ``rejected`` (the client should drop them) rather than
+    failing the batch. The response maps every key to its server id and
+    carries the workouts/sets/exercises changed since
+    ``since`` (re-sending the last SYNC_OVERLAP, so clients upsert by id)
+    together with the next token: the newest ``updated_at`` it returned.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=401)
+    try:
+        payload = json.loads(request.body)
+        workouts = payload.get("workouts") or []
+        sets = payload.get("sets") or []
+        since = payload.get("since")
+        if since is not None:
+            since = parse_datetime(since)
+            if since is None:
+                raise SyncError("Invalid sync token")
+        if len(workouts) + len(sets) > SYNC_MAX_BATCH:
+            raise SyncError(f"Batch too large (max {SYNC_MAX_BATCH})")
+        if not all(isinstance(item, dict) for item in [*workouts, *sets]):
+            raise SyncError("Items must be objects")
+    except (ValueError, TypeError, AttributeError) as exc:
+        return JsonResponse({"error": f"Invalid payload: {exc}"}, status=400)
+    except SyncError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    try:
+        try:
+            applied_workouts, applied_sets, rejected_sets = _apply(request.user, workouts, sets)
+        except IntegrityError:
+            # A concurrent replay of the same batch inserted the keys first;
+            # on the second pass they are found and mapped to its rows.
+            applied_workouts, applied_sets, rejected_sets = _apply(request.user, workouts, sets)
+    except SyncError as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    except IntegrityError:
+        return JsonResponse({"error": "Conflicting sync in progress, retry"}, status=409)
+
+    changes = _changes_since(request.user, since)
+    stamps = [row["updated_at"] for rows in changes.values() for row in rows]
+    if since is not None:
+        stamps.append(since)
+    token = max(stamps, default=None)
+    return JsonResponse({
+        "token": token.isoformat() if token else None,
+        "applied": {
+            "workouts": applied_workouts,
+            "sets": applied_sets,
+        },
+        "rejected": {"sets": rejected_sets},
+        "changes": changes,
+    })
+
 def home_view(request):
     return render(request, 'workouts/home.html')
\ No newline at end of file